@@ -0,0 +1,62 @@
+#! /usr/bin/env python
+"""
+Compare the GdkPixbuf and NumPy implementations of the pixel operations in
+traylib.pixbuf_helper.
+
+Usage: bench_pixbuf_helper.py [COUNT] [SIZE]
+
+Processes COUNT (default: 80) icons of SIZE x SIZE (default: 48) pixels,
+like greying out all icons after a workspace switch.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gtk
+
+from traylib import pixbuf_helper, pixbuf_numpy
+
+
+def make_pixbufs(count, size):
+    pixbufs = []
+    for i in xrange(count):
+        pixbuf = gtk.gdk.Pixbuf(gtk.gdk.COLORSPACE_RGB, True, 8, size, size)
+        pixbuf.fill((i * 0x01020304) & 0xffffffff)
+        pixbufs.append(pixbuf)
+    return pixbufs
+
+
+def bench(name, function, repeat=5, number=10):
+    best = min(timeit.repeat(function, repeat=repeat, number=number))
+    print "%-40s %8.2f ms" % (name, best / number * 1000)
+
+
+def main(args):
+    count = int(args[0]) if len(args) > 0 else 80
+    size = int(args[1]) if len(args) > 1 else 48
+    pixbufs = make_pixbufs(count, size)
+    print "%d pixbufs of %dx%d pixels" % (count, size, size)
+
+    bench("greyscale, GdkPixbuf", lambda: [
+        pixbuf_helper._convert_to_greyscale(p) for p in pixbufs
+    ])
+    bench("alpha, GdkPixbuf", lambda: [
+        pixbuf_helper._change_alpha(p, 128) for p in pixbufs
+    ])
+    if pixbuf_numpy.numpy is None:
+        print "NumPy is not installed, skipping NumPy benchmarks."
+        return 0
+    bench("greyscale, NumPy batch", lambda:
+        pixbuf_numpy.convert_to_greyscale_batch(pixbufs)
+    )
+    bench("alpha, NumPy batch", lambda:
+        pixbuf_numpy.change_alpha_batch(pixbufs, 128)
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,6 +1,7 @@
 import os
 
 import gtk
+import gobject
 
 import rox
 
@@ -18,6 +19,10 @@ try:
 except ImportError:
     wnck = None
 
+# The IconLoaderPool decodes icons in threads. Threads must be enabled
+# before the main loop is entered, or it never releases the GIL.
+gobject.threads_init()
+
 TOOLTIPS = gtk.Tooltips()
 ICON_THEME = gtk.icon_theme_get_default()
 
@@ -0,0 +1,214 @@
+import os
+import time
+import traceback
+
+import gobject
+
+
+try:
+    monotonic = time.monotonic
+except AttributeError:
+    def monotonic():
+        """@return: The elapsed real time in seconds (not wall clock)."""
+        return os.times()[4]
+
+
+class AnimationClock(object):
+    """
+    Calls the callbacks of all running animations from a single timer.
+
+    The timer runs at most C{fps} times per second, and only as often as
+    the callbacks need it: if all of them have an interval (like blinking
+    icons), it wakes up once per interval. It stops when there are no
+    callbacks left.
+    """
+
+    def __init__(self, fps=60):
+        """
+        Initialize an AnimationClock.
+
+        @param fps: The maximum number of ticks per second.
+        """
+        self.__fps = fps
+        # Maps handles to [callback, interval, due time].
+        self.__callbacks = {}
+        self.__next_handle = 1
+        self.__event = 0
+        self.__period = 0
+
+    def add(self, callback, interval=0):
+        """
+        Call a function on every tick of the clock, until it returns
+        C{False}.
+
+        @param callback: A function without arguments.
+        @param interval: The minimum time between two calls (in ms). If
+            C{0}, the function is called on every tick.
+
+        @return: A handle which can be passed to L{remove}.
+        """
+        handle = self.__next_handle
+        self.__next_handle += 1
+        self.__callbacks[handle] = [
+            callback, interval, monotonic() + interval / 1000.0
+        ]
+        self.__reschedule()
+        return handle
+
+    def remove(self, handle):
+        """Stop calling the function registered with the given handle."""
+        self.__callbacks.pop(handle, None)
+
+    @property
+    def fps(self):
+        """The maximum number of ticks per second."""
+        return self.__fps
+
+    @fps.setter
+    def fps(self, fps):
+        self.__fps = max(1, fps)
+        self.__reschedule()
+
+    @property
+    def running(self):
+        """C{True} if the timer is running."""
+        return self.__event != 0
+
+    def __get_period(self):
+        frame = 1000 / self.__fps
+        return max(
+            frame, min(entry[1] for entry in self.__callbacks.itervalues())
+        )
+
+    def __reschedule(self):
+        if not self.__callbacks:
+            return
+        period = self.__get_period()
+        if self.__event != 0:
+            if period == self.__period:
+                return
+            gobject.source_remove(self.__event)
+        self.__period = period
+        self.__event = gobject.timeout_add(period, self.__tick)
+
+    def __tick(self):
+        now = monotonic()
+        # Let callbacks which are due within half a frame run now, so timer
+        # jitter does not make them skip a whole period.
+        slack = 0.5 / self.__fps
+        for handle, entry in self.__callbacks.items():
+            if handle not in self.__callbacks:
+                # Removed by another callback during this tick.
+                continue
+            callback, interval, due = entry
+            if now + slack < due:
+                continue
+            entry[2] = max(due + interval / 1000.0, now)
+            try:
+                keep = callback()
+            except Exception:
+                traceback.print_exc()
+                keep = False
+            if not keep:
+                self.__callbacks.pop(handle, None)
+        if not self.__callbacks:
+            self.__event = 0
+            return False
+        if self.__get_period() != self.__period:
+            self.__event = 0
+            self.__reschedule()
+            return False
+        return True
+
+
+ANIMATION_CLOCK = AnimationClock()
+"""The L{AnimationClock} driving the animations of all L{Icon}s."""
+
+
+def ease_out(fract):
+    """
+    Cubic easing, starting fast and slowing down towards the target.
+
+    @param fract: The elapsed fraction of the animation (0.0-1.0).
+
+    @return: The fraction of the distance to move.
+    """
+    return 1.0 - (1.0 - fract) ** 3
+
+
+class Tween(object):
+    """
+    An integer value moving towards its target within a fixed duration.
+
+    The value is computed from the elapsed time, not from the number of
+    steps, so an animation takes the same time no matter how far the value
+    has to move or how often L{step} is called. Frames which could not be
+    drawn in time are skipped.
+    """
+
+    def __init__(self, value, duration, easing=ease_out):
+        """
+        Initialize a Tween.
+
+        @param value: The initial value and target.
+        @param duration: The time to reach a new target (in seconds).
+        @param easing: Maps the elapsed fraction of the duration to the
+            fraction of the distance moved.
+        """
+        self.__value = self.__start = self.__target = value
+        self.__start_time = 0.0
+        self.__duration = duration
+        self.__easing = easing
+
+    def step(self, now=None):
+        """
+        Move the value to where it should be at the given time.
+
+        @param now: The time as returned by L{monotonic}.
+
+        @return: The new value.
+        """
+        if self.__value == self.__target:
+            return self.__value
+        if now is None:
+            now = monotonic()
+        fract = (now - self.__start_time) / self.__duration
+        if fract >= 1.0 or fract < 0.0:
+            self.__value = self.__target
+        else:
+            self.__value = self.__start + int(round(
+                (self.__target - self.__start) * self.__easing(fract)
+            ))
+        return self.__value
+
+    def finish(self):
+        """Move the value to the target immediately."""
+        self.__value = self.__target
+
+    @property
+    def done(self):
+        """C{True} if the value has reached the target."""
+        return self.__value == self.__target
+
+    @property
+    def value(self):
+        """The current value. Setting it starts a new animation from it."""
+        return self.__value
+
+    @value.setter
+    def value(self, value):
+        self.__value = self.__start = value
+        self.__start_time = monotonic()
+
+    @property
+    def target(self):
+        """The value to move towards."""
+        return self.__target
+
+    @target.setter
+    def target(self, target):
+        if target == self.__target:
+            return
+        self.__start = self.__value
+        self.__start_time = monotonic()
+        self.__target = target
@@ -0,0 +1,241 @@
+import os
+import time
+import tempfile
+import cPickle as pickle
+from collections import namedtuple
+from urllib import url2pathname
+
+from traylib import APPDIRPATH, XDG_CACHE_HOME
+
+
+AppDir = namedtuple('AppDir', ['name', 'path', 'icon_path', 'appinfo_mtime'])
+"""
+An entry of the L{AppDirIndex}: the name and path of an AppDir, the path of
+its C{.DirIcon} and the mtime of its C{AppInfo.xml} (or C{None}).
+"""
+
+_VERSION = 2
+
+
+class AppDirIndex(object):
+    """
+    Index of the AppDirs in C{APPDIRPATH}.
+
+    The index is built once and then refreshed incrementally: only
+    directories whose mtime has changed, or which contain a directory whose
+    mtime or C{AppInfo.xml} has changed, are listed again. It is stored in
+    C{$XDG_CACHE_HOME/traylib}, so later processes start with a warm index.
+    AppDirs may be put directly into a directory of C{APPDIRPATH} or into a
+    subdirectory of it (like C{~/Apps/Graphics/Gimp}).
+    """
+
+    def __init__(self, appdirpath=APPDIRPATH, filename=None,
+                 refresh_interval=5.0):
+        """
+        Initialize an AppDirIndex.
+
+        @param appdirpath: The directories to search for AppDirs.
+        @param filename: The file to store the index in.
+        @param refresh_interval: Lookups refresh the index if it has not
+            been refreshed for this many seconds.
+        """
+        self.__appdirpath = list(appdirpath)
+        if filename is None:
+            filename = os.path.join(XDG_CACHE_HOME, 'traylib', 'appdirs')
+        self.__filename = filename
+        self.__refresh_interval = refresh_interval
+        self.__last_refresh = None
+        # Maps every scanned directory to (mtime, subdirectories, appdirs,
+        # stamps). The stamps are (path, mtime, AppInfo.xml mtime) tuples of
+        # the directories in it.
+        self.__dirs = {}
+        self.__by_path = {}
+        self.__by_name = {}
+
+    def find_by_name(self, name):
+        """
+        @return: The L{AppDir} with the given name, or C{None}. If there are
+            several, the one found first in C{APPDIRPATH} is returned.
+        """
+        self.__auto_refresh()
+        return self.__by_name.get(name)
+
+    def find_by_path(self, path):
+        """
+        @return: The L{AppDir} at the given path (or the AppDir containing
+            the given C{AppRun}), or C{None}.
+        """
+        self.__auto_refresh()
+        path = os.path.normpath(os.path.expanduser(path))
+        if os.path.basename(path) == 'AppRun':
+            path = os.path.dirname(path)
+        return self.__by_path.get(path)
+
+    def find_by_uri(self, uri):
+        """
+        @return: The L{AppDir} the given C{file://} URI points to, or
+            C{None}.
+        """
+        if uri.startswith('file://'):
+            path = uri[len('file://'):]
+            if not path.startswith('/'):
+                # Strip the host name.
+                path = path[path.find('/'):]
+        elif uri.startswith('/'):
+            path = uri
+        else:
+            return None
+        return self.find_by_path(url2pathname(path))
+
+    @property
+    def appdirs(self):
+        """All indexed L{AppDir}s."""
+        self.__auto_refresh()
+        return self.__by_path.values()
+
+    def refresh(self):
+        """
+        Bring the index up to date, listing only directories that have
+        changed since the last refresh.
+        """
+        if self.__last_refresh is None:
+            self.__load()
+        changed = False
+        seen = set()
+        for directory in self.__appdirpath:
+            changed = self.__refresh_dir(directory, 2, seen) or changed
+        for directory in set(self.__dirs) - seen:
+            del self.__dirs[directory]
+            changed = True
+        if changed:
+            self.__rebuild()
+            self.__save()
+        self.__last_refresh = time.time()
+
+    def __auto_refresh(self):
+        if (self.__last_refresh is None or
+                time.time() - self.__last_refresh > self.__refresh_interval):
+            self.refresh()
+
+    def __refresh_dir(self, directory, depth, seen):
+        seen.add(directory)
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            return self.__dirs.pop(directory, None) is not None
+        changed = False
+        entry = self.__dirs.get(directory)
+        if entry is None or entry[0] != mtime or _is_stale(entry[3]):
+            entry = self.__scan_dir(directory, mtime, depth)
+            self.__dirs[directory] = entry
+            changed = True
+        for subdir in entry[1]:
+            changed = self.__refresh_dir(subdir, depth - 1, seen) or changed
+        return changed
+
+    def __scan_dir(self, directory, mtime, depth):
+        subdirs = []
+        appdirs = []
+        stamps = []
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            names = []
+        for name in names:
+            if name.startswith('.'):
+                continue
+            path = os.path.join(directory, name)
+            if not os.path.isdir(path):
+                continue
+            stamp = _get_stamp(path)
+            stamps.append(stamp)
+            if os.path.exists(os.path.join(path, 'AppRun')):
+                appdirs.append(AppDir(
+                    name, path, os.path.join(path, '.DirIcon'), stamp[2]
+                ))
+            elif depth > 1:
+                subdirs.append(path)
+        return (mtime, subdirs, appdirs, stamps)
+
+    def __rebuild(self):
+        self.__by_path = {}
+        self.__by_name = {}
+        for directory in self.__appdirpath:
+            self.__add_appdirs(directory)
+
+    def __add_appdirs(self, directory):
+        try:
+            mtime, subdirs, appdirs, stamps = self.__dirs[directory]
+        except KeyError:
+            return
+        for appdir in appdirs:
+            self.__by_path[appdir.path] = appdir
+            self.__by_name.setdefault(appdir.name, appdir)
+        for subdir in subdirs:
+            self.__add_appdirs(subdir)
+
+    def __load(self):
+        try:
+            with open(self.__filename, 'rb') as f:
+                version, appdirpath, dirs = pickle.load(f)
+        except Exception:
+            return
+        if version != _VERSION or appdirpath != self.__appdirpath:
+            return
+        self.__dirs = dict(
+            (directory,
+             (mtime, subdirs, [AppDir(*a) for a in appdirs], stamps))
+            for directory, (mtime, subdirs, appdirs, stamps)
+            in dirs.iteritems()
+        )
+        self.__rebuild()
+
+    def __save(self):
+        dirs = dict(
+            (directory,
+             (mtime, subdirs, [tuple(a) for a in appdirs], stamps))
+            for directory, (mtime, subdirs, appdirs, stamps)
+            in self.__dirs.iteritems()
+        )
+        directory = os.path.dirname(self.__filename)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            fd, tmp_filename = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(
+                    (_VERSION, self.__appdirpath, dirs), f,
+                    pickle.HIGHEST_PROTOCOL
+                )
+            os.rename(tmp_filename, self.__filename)
+        except (IOError, OSError):
+            pass
+
+
+def _get_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _get_stamp(path):
+    return (
+        path, _get_mtime(path), _get_mtime(os.path.join(path, 'AppInfo.xml'))
+    )
+
+
+def _is_stale(stamps):
+    """
+    @return: C{True} if a directory has changed since the stamps were taken,
+        for example because an C{AppRun} has been added or removed or an
+        C{AppInfo.xml} has been edited in place.
+    """
+    for stamp in stamps:
+        if _get_stamp(stamp[0]) != stamp:
+            return True
+    return False
+
+
+APPDIR_INDEX = AppDirIndex()
+"""The L{AppDirIndex} of the AppDirs in C{APPDIRPATH}."""
@@ -0,0 +1,142 @@
+import os
+import struct
+import hashlib
+import tempfile
+import threading
+
+import gtk
+
+
+_MAGIC = 'TLI1'
+_HEADER = struct.Struct('<4sHH')
+
+
+class DiskIconCache(object):
+    """
+    Persistent cache of scaled icons.
+
+    Every icon is stored in its own file as a small header followed by the
+    raw, unpadded RGBA pixels, so it can be loaded with a single read and
+    without decoding. Files are keyed by source path, mtime, size and icon
+    theme name. When the cache grows beyond its limit, the least recently
+    written files are removed.
+    """
+
+    def __init__(self, directory, max_bytes=16*1024*1024):
+        """
+        Initialize a DiskIconCache.
+
+        @param directory: The directory to store the icons in.
+        @param max_bytes: The maximum total size of the cached icons.
+        """
+        self.__directory = directory
+        self.__max_bytes = max_bytes
+        self.__total_bytes = None
+        self.__lock = threading.Lock()
+        self.theme_name = ''
+        """The name of the icon theme, which is part of the key."""
+
+    def get(self, path, mtime, size):
+        """
+        Load a cached icon.
+
+        @return: The cached C{gtk.gdk.Pixbuf} or C{None}.
+        """
+        filename = self.__filename(path, mtime, size)
+        try:
+            with open(filename, 'rb') as f:
+                data = f.read()
+        except (IOError, OSError):
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        magic, width, height = _HEADER.unpack_from(data)
+        if magic != _MAGIC or len(data) != _HEADER.size + width*height*4:
+            return None
+        return gtk.gdk.pixbuf_new_from_data(
+            data[_HEADER.size:], gtk.gdk.COLORSPACE_RGB, True, 8,
+            width, height, width*4
+        )
+
+    def put(self, path, mtime, size, pixbuf):
+        """Store an icon in the cache."""
+        if not pixbuf.get_has_alpha():
+            pixbuf = pixbuf.add_alpha(False, 0, 0, 0)
+        width = pixbuf.get_width()
+        height = pixbuf.get_height()
+        rowstride = pixbuf.get_rowstride()
+        pixels = pixbuf.get_pixels()
+        data = ''.join(
+            [_HEADER.pack(_MAGIC, width, height)] + [
+                pixels[row*rowstride:row*rowstride + width*4]
+                for row in xrange(height)
+            ]
+        )
+        try:
+            if not os.path.isdir(self.__directory):
+                os.makedirs(self.__directory)
+            fd, tmp_filename = tempfile.mkstemp(dir=self.__directory)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.rename(tmp_filename, self.__filename(path, mtime, size))
+        except (IOError, OSError):
+            return
+        with self.__lock:
+            if self.__total_bytes is None:
+                self.__total_bytes = self.__du()
+            else:
+                self.__total_bytes += len(data)
+            if self.__total_bytes > self.__max_bytes:
+                self.__evict()
+
+    def clear(self):
+        """Remove all cached icons."""
+        with self.__lock:
+            for filename, stat in self.__files():
+                try:
+                    os.unlink(filename)
+                except OSError:
+                    pass
+            self.__total_bytes = 0
+
+    def __filename(self, path, mtime, size):
+        key = '%s\0%r\0%d\0%s' % (path, mtime, size, self.theme_name)
+        if isinstance(key, unicode):
+            key = key.encode('utf-8')
+        return os.path.join(
+            self.__directory, hashlib.sha1(key).hexdigest() + '.rgba'
+        )
+
+    def __files(self):
+        try:
+            names = os.listdir(self.__directory)
+        except OSError:
+            return []
+        files = []
+        for name in names:
+            filename = os.path.join(self.__directory, name)
+            try:
+                files.append((filename, os.stat(filename)))
+            except OSError:
+                pass
+        return files
+
+    def __du(self):
+        return sum(stat.st_size for filename, stat in self.__files())
+
+    def __evict(self):
+        # Shrink to 3/4 of the limit, so we do not evict on every put.
+        files = sorted(self.__files(), key=lambda f: f[1].st_mtime)
+        total_bytes = sum(stat.st_size for filename, stat in files)
+        for filename, stat in files:
+            if total_bytes <= self.__max_bytes * 3 / 4:
+                break
+            try:
+                os.unlink(filename)
+            except OSError:
+                continue
+            total_bytes -= stat.st_size
+        self.__total_bytes = total_bytes
+
+    directory = property(lambda self: self.__directory)
+    """The directory the icons are stored in."""
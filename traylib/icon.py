@@ -1,12 +1,16 @@
+import weakref
+
 import gtk
 import gobject
+import cairo
 
 from traylib import (
     LEFT, RIGHT, TOP, BOTTOM, TOOLTIPS, ICON_THEME, TARGET_URI_LIST,
     TARGET_MOZ_URL, pixmaps
 )
 from traylib.icon_config import IconConfig
-from traylib.pixbuf_helper import scale_pixbuf_to_size
+from traylib.animation import ANIMATION_CLOCK, Tween, monotonic
+from traylib.pixbuf_helper import scale_pixbuf_to_size, TransformCache
 
 
 _targets = [("text/uri-list", 0, TARGET_URI_LIST),
@@ -20,6 +24,70 @@ down in order to speed up later scaling.
 """
 
 
+ZOOM_DURATION = 0.2
+"""The time it takes to zoom an icon to a new size (in seconds)."""
+
+FADE_DURATION = 0.25
+"""
+The time it takes to fade an icon, its arrow or its emblem in or out (in
+seconds).
+"""
+
+
+class _Canvas(object):
+    """
+    A pixbuf of the maximum size of an L{Icon}, drawn into through
+    sub-pixbuf views of the size needed. The views share the pixels of the
+    pixbuf, so changing the size of a view does not allocate any pixels.
+    """
+
+    def __init__(self):
+        self.__pixbuf = None
+        self.__views = {}
+
+    def get_view(self, width, height, max_size):
+        """
+        @return: A view of the top left C{width} x C{height} pixels of a
+            C{max_size} x C{max_size} pixbuf.
+        """
+        if self.__pixbuf is None or self.__pixbuf.get_width() != max_size:
+            self.__pixbuf = gtk.gdk.Pixbuf(
+                gtk.gdk.COLORSPACE_RGB, True, 8, max_size, max_size
+            )
+            self.__views = {}
+        key = (width, height)
+        try:
+            return self.__views[key]
+        except KeyError:
+            view = self.__views[key] = self.__pixbuf.subpixbuf(
+                0, 0, width, height
+            )
+            return view
+
+    def release(self):
+        """Drop the pixbuf. It is allocated again by the next view."""
+        self.__pixbuf = None
+        self.__views = {}
+
+
+FRAME_CACHE = TransformCache(max_results=32)
+"""
+The frames of the zoom animations of all L{Icon}s, that is their pixbufs
+scaled to the sizes used so far, keyed by source pixbuf, size and
+interpolation type. L{Icon}s showing the same (interned) pixbuf share them.
+"""
+
+
+# The cairo filters used instead of the interpolation types when drawing
+# directly.
+_CAIRO_FILTERS = {
+    gtk.gdk.INTERP_NEAREST: cairo.FILTER_FAST,
+    gtk.gdk.INTERP_TILES: cairo.FILTER_GOOD,
+    gtk.gdk.INTERP_BILINEAR: cairo.FILTER_GOOD,
+    gtk.gdk.INTERP_HYPER: cairo.FILTER_BEST,
+}
+
+
 # Action constants that are used to determine if an icon is in the process of 
 # being shown, hidden or destroyed.
 ZOOM_ACTION_NONE = 0
@@ -41,10 +109,26 @@ class Icon(gtk.EventBox, object):
         self.__image.show()
         self.add(self.__image)
         self.__canvas = None
+        # The layers are composited separately, so a tick which only changes
+        # the arrow or the emblem does not need to redraw the icon. Each key
+        # holds the state the layer was drawn in. They are drawn into
+        # views of max-size canvases, so animations do not allocate pixbufs.
+        # The emblem and arrow layers are released when they have faded out.
+        self.__base_layer = _Canvas()
+        self.__base_key = None
+        self.__lower_layer = _Canvas()
+        self.__lower_key = None
+        self.__top_layer = _Canvas()
+        self.__canvas_key = None
+
+        # direct drawing
+        self.__drawing_area = None
+        # The layers drawn by the last expose, to find the area to redraw.
+        self.__drawn_layers = []
+        # cairo surfaces of the pixbufs drawn so far.
+        self.__surfaces = weakref.WeakKeyDictionary()
         self.__pixbuf = None
-        self.__pixbuf_current = None
-        self.__current_alpha = 0xff
-        self.__target_alpha = 0xff
+        self.__fade = Tween(0xff, FADE_DURATION)
 
         # blink
         self.__blink_event = 0
@@ -57,8 +141,8 @@ class Icon(gtk.EventBox, object):
         self.__size = 32
 
         # zoom
-        self.__target_size = self.__size
-        self.__current_size = 1
+        self.__zoom = Tween(1, ZOOM_DURATION)
+        self.__zoom.target = self.__size
         self.__zoom_factor = 1.0
         self.__zoom_factor_orig = 1.0
         self.__zoom_factor_base = 1.0
@@ -71,17 +155,19 @@ class Icon(gtk.EventBox, object):
         # effects
         self.__effects = False
 
+        # interpolation
+        self.__interp_animation = gtk.gdk.INTERP_NEAREST
+        self.__interp_rest = gtk.gdk.INTERP_BILINEAR
+
         # arrow
         self.__has_arrow = False
         self.__arrow = None
-        self.__arrow_target_alpha = 0
-        self.__arrow_current_alpha = 0
+        self.__arrow_fade = Tween(0, FADE_DURATION)
 
         # emblem
         self.__emblem_orig = None
         self.__emblem_scaled = None
-        self.__emblem_target_alpha = 0
-        self.__emblem_current_alpha = 0
+        self.__emblem_fade = Tween(0, FADE_DURATION)
 
         self.__update_max_size()
         self.__update_size_request()
@@ -136,7 +222,7 @@ class Icon(gtk.EventBox, object):
             return running
         if blinking:
             if self.__blink_event == 0:
-                self.__blink_event = gobject.timeout_add(time, blink)
+                self.__blink_event = ANIMATION_CLOCK.add(blink, time)
         else:
             self.__blink_event = 0
 
@@ -150,7 +236,8 @@ class Icon(gtk.EventBox, object):
         self.__emblem_orig = emblem
         if self.__emblem_orig is not None:
             self.__emblem_scaled = scale_pixbuf_to_size(
-                self.__emblem_orig, self.__max_size/3, scale_up=False
+                self.__emblem_orig, self.__max_size/3, scale_up=False,
+                interp_type=self.__interp_rest
             )
 
         self.__update_emblem_target_alpha()
@@ -173,10 +260,9 @@ class Icon(gtk.EventBox, object):
                 self.__pixbuf.get_width() >= MAX_SIZE or
                 self.__pixbuf.get_height() >= MAX_SIZE)):
             self.__pixbuf = scale_pixbuf_to_size(
-                self.__pixbuf, MAX_SIZE, False
+                self.__pixbuf, MAX_SIZE, False,
+                interp_type=self.__interp_rest
             )
-        if old_pixbuf is not self.__pixbuf:
-            self.__pixbuf_current = None
         self._refresh(self.__pixbuf is not old_pixbuf)
 
     @property
@@ -258,6 +344,66 @@ class Icon(gtk.EventBox, object):
         self.__effects = effects
         self._refresh(True)
 
+    @property
+    def interp_animation(self):
+        """
+        The C{gtk.gdk.INTERP_*} type used for intermediate animation frames.
+        """
+        return self.__interp_animation
+
+    @interp_animation.setter
+    def interp_animation(self, interp_animation):
+        self.__interp_animation = interp_animation
+
+    @property
+    def interp_rest(self):
+        """The C{gtk.gdk.INTERP_*} type used for the icon at rest."""
+        return self.__interp_rest
+
+    @interp_rest.setter
+    def interp_rest(self, interp_rest):
+        if self.__interp_rest == interp_rest:
+            return
+        self.__interp_rest = interp_rest
+        self.emblem = self.__emblem_orig
+        self._refresh(True)
+
+    @property
+    def direct_drawing(self):
+        """
+        If C{True}, the C{Icon} draws its layers with cairo when exposed,
+        instead of compositing them into a pixbuf shown by a C{gtk.Image}.
+        Animation frames then only redraw the area that has changed.
+        """
+        return self.__drawing_area is not None
+
+    @direct_drawing.setter
+    def direct_drawing(self, direct_drawing):
+        if direct_drawing == self.direct_drawing:
+            return
+        if direct_drawing:
+            self.remove(self.__image)
+            self.__image.clear()
+            self.__canvas = None
+            self.__canvas_key = None
+            self.__base_key = None
+            self.__lower_key = None
+            for layer in (self.__base_layer, self.__lower_layer,
+                          self.__top_layer):
+                layer.release()
+            self.__drawing_area = gtk.DrawingArea()
+            self.__drawing_area.connect("expose-event", self.__expose_area)
+            self.__drawing_area.show()
+            self.add(self.__drawing_area)
+        else:
+            self.remove(self.__drawing_area)
+            self.__drawing_area.destroy()
+            self.__drawing_area = None
+            self.__drawn_layers = []
+            self.__surfaces.clear()
+            self.add(self.__image)
+        self._refresh(True)
+
     @property
     def size(self):
         return self.__size
@@ -276,50 +422,39 @@ class Icon(gtk.EventBox, object):
 
     @property
     def alpha(self):
-        return self.__target_alpha
+        return self.__fade.target
 
     @alpha.setter
     def alpha(self, alpha):
-        if self.__target_alpha == alpha:
+        if self.__fade.target == alpha:
             return
-        self.__target_alpha = alpha
+        self.__fade.target = alpha
         self._refresh()
 
     def __update_arrow_target_alpha(self):
         if self.__zoom_action in (ZOOM_ACTION_HIDE, ZOOM_ACTION_DESTROY): 
             return
         if self.__has_arrow:
-            self.__arrow_target_alpha = 255
+            self.__arrow_fade.target = 255
         else:
-            self.__arrow_target_alpha = 0
+            self.__arrow_fade.target = 0
 
-    def __update_canvas(self):
+    def __get_canvas_size(self):
         if (self.__zoom_action == ZOOM_ACTION_NONE or
-                self.__emblem_scaled and self.__emblem_current_alpha > 0):
-            width = self.__max_size
-            height = self.__max_size
-        else:
-            if self.__edge in (0, TOP, BOTTOM):
-                width = min(int(self.__current_size * 1.5), self.__max_size)
-                height = self.__max_size
-            else:
-                width = self.__max_size
-                height = min(int(self.__current_size * 1.5), self.__max_size)
-        if (self.__canvas and
-                self.__canvas.get_width() == width and
-                self.__canvas.get_height() == height):
-            return
-        self.__canvas = gtk.gdk.Pixbuf(
-            gtk.gdk.COLORSPACE_RGB, True, 8, width, height
-        )
+                self.__emblem_scaled and self.__emblem_fade.value > 0):
+            return self.__max_size, self.__max_size
+        size = min(int(self.__zoom.value * 1.5), self.__max_size)
+        if self.__edge in (0, TOP, BOTTOM):
+            return size, self.__max_size
+        return self.__max_size, size
 
     def __update_emblem_target_alpha(self):
         if self.__zoom_action in (ZOOM_ACTION_HIDE, ZOOM_ACTION_DESTROY): 
             return
         if self.__emblem_orig:
-            self.__emblem_target_alpha = 196
+            self.__emblem_fade.target = 196
         else:
-            self.__emblem_target_alpha = 0
+            self.__emblem_fade.target = 0
             
     def __update_max_size(self):
         self.__max_size = int(self.__size*1.5)
@@ -357,17 +492,13 @@ class Icon(gtk.EventBox, object):
         effects = self.__effects
 
         if self.__zoom_action not in (ZOOM_ACTION_HIDE, ZOOM_ACTION_DESTROY):
-            self.__target_size = max(
+            self.__zoom.target = max(
                 1, min(
                     int(self.__size * self.__zoom_factor), 
                     self.__max_size - 2
                 )
             )
-            if (not force and
-                    self.__current_size == self.__target_size and
-                    self.__arrow_current_alpha == self.__arrow_target_alpha and
-                    self.__emblem_current_alpha == self.__emblem_target_alpha and
-                    self.__current_alpha == self.__target_alpha):
+            if not force and self.__is_animation_done():
                 return
 
         if self.__zoom_event != 0:
@@ -375,94 +506,280 @@ class Icon(gtk.EventBox, object):
 
         if effects:            
             if self.__refresh():
-                self.__zoom_event = gobject.timeout_add(6, self.__refresh)
+                self.__zoom_event = ANIMATION_CLOCK.add(self.__refresh)
         else:
-            self.__arrow_current_alpha = self.__arrow_target_alpha
-            self.__emblem_current_alpha = self.__emblem_target_alpha
-            self.__current_alpha = self.__target_alpha
-            self.__current_size = self.__target_size
-            self.__pixbuf_current = None
-            while self.__refresh():
+            while self.__refresh(False):
                 pass
 
-    def __refresh(self):
-        if not self.__pixbuf:
-            return False
+    def __is_animation_done(self):
+        return (self.__zoom.done and self.__arrow_fade.done and
+                self.__emblem_fade.done and self.__fade.done)
 
-        edge = self.__edge
+    def __get_frame(self, size, interp_type):
+        return FRAME_CACHE.transform(
+            self.__pixbuf, scale_pixbuf_to_size, size, True, False,
+            interp_type
+        )
 
-        if (not self.__pixbuf_current or
-                self.__current_size != self.__target_size):
-            self.__pixbuf_current = scale_pixbuf_to_size(
-                self.__pixbuf, self.__current_size
-            )
-        self.__update_canvas()
-        self.__canvas.fill(0x000000)
-        canvas_width = self.__canvas.get_width()
-        canvas_height = self.__canvas.get_height()
-        width = self.__pixbuf_current.get_width()
-        height = self.__pixbuf_current.get_height()
+    def __get_icon_position(self, width, height, canvas_width,
+                            canvas_height):
         x = int(round(float(canvas_width)/2.0) 
                 - round(float(width)/2.0))
         y = int(round(float(canvas_height)/2.0) 
                 - round(float(height)/2.0))
-        self.__pixbuf_current.composite(
-            self.__canvas, x, y, width, height, x, y, 1.0, 1.0,
-            gtk.gdk.INTERP_TILES, self.__current_alpha
+        return x, y
+
+    def __get_arrow_position(self, canvas_width, canvas_height):
+        edge = self.__edge
+        width = self.__arrow.get_width()
+        height = self.__arrow.get_height()
+        x = 0
+        y = 0
+        if edge in (0, TOP, BOTTOM):
+            x = canvas_width/2 - width/2
+            if edge == TOP:
+                y = canvas_height - height 
+        if edge in (LEFT, RIGHT):
+            y = canvas_height/2 - height/2
+            if edge == LEFT:
+                x = canvas_width - width
+        return x, y
+
+    def __draw(self, interp_type):
+        pixbuf = self.__get_frame(self.__zoom.value, interp_type)
+        canvas_width, canvas_height = self.__get_canvas_size()
+        max_size = self.__max_size
+
+        # The icon.
+        base = self.__base_layer.get_view(
+            canvas_width, canvas_height, max_size
         )
-        if self.__emblem_current_alpha > 0:
-            width = self.__max_size/3
-            height = width
-            self.__emblem_scaled.composite(
-                self.__canvas, 0, 0, width, height, 0, 0, 1.0, 1.0,
-                gtk.gdk.INTERP_TILES, self.__emblem_current_alpha
+        base_key = (base, pixbuf, self.__fade.value)
+        if base_key != self.__base_key:
+            base.fill(0x000000)
+            width = pixbuf.get_width()
+            height = pixbuf.get_height()
+            x, y = self.__get_icon_position(
+                width, height, canvas_width, canvas_height
+            )
+            pixbuf.composite(
+                base, x, y, width, height, x, y, 1.0, 1.0,
+                gtk.gdk.INTERP_NEAREST, self.__fade.value
+            )
+            self.__base_key = base_key
+        canvas = base
+
+        # The emblem, on top of the icon.
+        emblem_alpha = self.__emblem_fade.value
+        lower_key = (base_key, self.__emblem_scaled, emblem_alpha)
+        if emblem_alpha > 0:
+            lower = self.__lower_layer.get_view(
+                canvas_width, canvas_height, max_size
+            )
+            if lower_key != self.__lower_key:
+                base.copy_area(
+                    0, 0, canvas_width, canvas_height, lower, 0, 0
+                )
+                width = max_size/3
+                height = width
+                self.__emblem_scaled.composite(
+                    lower, 0, 0, width, height, 0, 0, 1.0, 1.0,
+                    gtk.gdk.INTERP_NEAREST, emblem_alpha
+                )
+                self.__lower_key = lower_key
+            canvas = lower
+        elif self.__emblem_fade.done:
+            self.__lower_layer.release()
+            self.__lower_key = None
+
+        # The arrow, on top of both.
+        arrow_alpha = self.__arrow_fade.value
+        canvas_key = (lower_key, self.__arrow, self.__edge, arrow_alpha)
+        if canvas_key == self.__canvas_key:
+            return
+        if arrow_alpha > 0:
+            top = self.__top_layer.get_view(
+                canvas_width, canvas_height, max_size
             )
-        if self.__arrow_current_alpha > 0:
+            canvas.copy_area(0, 0, canvas_width, canvas_height, top, 0, 0)
+            canvas = top
             arrow = self.__arrow
             width = arrow.get_width()
             height = arrow.get_height()
-            x = 0
-            y = 0
-            if edge in (0, TOP, BOTTOM):
-                x = canvas_width/2 - width/2
-                if edge == TOP:
-                    y = canvas_height - height 
-            if edge in (LEFT, RIGHT):
-                y = canvas_height/2 - height/2
-                if edge == LEFT:
-                    x = canvas_width - width
-
+            x, y = self.__get_arrow_position(canvas_width, canvas_height)
             arrow.composite(
-                self.__canvas, x, y, width, height, x, y, 1.0, 1.0,
-                gtk.gdk.INTERP_TILES, self.__arrow_current_alpha
+                canvas, x, y, width, height, x, y, 1.0, 1.0,
+                gtk.gdk.INTERP_NEAREST, arrow_alpha
+            )
+        elif self.__arrow_fade.done:
+            self.__top_layer.release()
+        self.__canvas = canvas
+        self.__canvas_key = canvas_key
+        self.__image.set_from_pixbuf(canvas)
+
+    def __get_layers(self, canvas_width, canvas_height):
+        """
+        @return: The layers to draw directly, bottom first, as a list of
+            C{(pixbuf, x, y, width, height, alpha)} tuples in canvas
+            coordinates. The pixbufs are scaled to C{width} x C{height} when
+            drawing.
+        """
+        size = self.__zoom.value
+        if self.__zoom.done:
+            pixbuf = self.__get_frame(size, self.__interp_rest)
+        else:
+            # Zoom the largest frame with a cairo transform.
+            pixbuf = self.__get_frame(self.__max_size, self.__interp_rest)
+        scale = float(size) / max(pixbuf.get_width(), pixbuf.get_height())
+        width = max(1, int(pixbuf.get_width() * scale))
+        height = max(1, int(pixbuf.get_height() * scale))
+        x, y = self.__get_icon_position(
+            width, height, canvas_width, canvas_height
+        )
+        layers = [(pixbuf, x, y, width, height, self.__fade.value)]
+        if self.__emblem_fade.value > 0:
+            emblem = self.__emblem_scaled
+            layers.append((
+                emblem, 0, 0, emblem.get_width(), emblem.get_height(),
+                self.__emblem_fade.value
+            ))
+        if self.__arrow_fade.value > 0:
+            arrow = self.__arrow
+            x, y = self.__get_arrow_position(canvas_width, canvas_height)
+            layers.append((
+                arrow, x, y, arrow.get_width(), arrow.get_height(),
+                self.__arrow_fade.value
+            ))
+        return layers
+
+    def __get_canvas_offset(self):
+        allocation = self.__drawing_area.allocation
+        canvas_width, canvas_height = self.__get_canvas_size()
+        return (
+            (allocation.width - canvas_width) / 2,
+            (allocation.height - canvas_height) / 2
+        )
+
+    def __get_surface(self, pixbuf):
+        try:
+            return self.__surfaces[pixbuf]
+        except KeyError:
+            surface = cairo.ImageSurface(
+                cairo.FORMAT_ARGB32, pixbuf.get_width(), pixbuf.get_height()
             )
-        self.__image.set_from_pixbuf(self.__canvas)
+            context = gtk.gdk.CairoContext(cairo.Context(surface))
+            context.set_source_pixbuf(pixbuf, 0, 0)
+            context.paint()
+            self.__surfaces[pixbuf] = surface
+            return surface
+
+    def __queue_draw(self):
+        area = self.__drawing_area
+        canvas_width, canvas_height = self.__get_canvas_size()
+        if area.get_size_request() != (canvas_width, canvas_height):
+            # Only show and hide animations change the size.
+            area.set_size_request(canvas_width, canvas_height)
+            area.queue_draw()
+            return
+        layers = self.__get_layers(canvas_width, canvas_height)
+        if layers == self.__drawn_layers:
+            return
+        # Redraw the area covered by the layers which have changed, before
+        # and after the change.
+        old_layers = set(self.__drawn_layers)
+        new_layers = set(layers)
+        changed = (old_layers - new_layers) | (new_layers - old_layers)
+        if not changed:
+            return
+        x1 = min(layer[1] for layer in changed)
+        y1 = min(layer[2] for layer in changed)
+        x2 = max(layer[1] + layer[3] for layer in changed)
+        y2 = max(layer[2] + layer[4] for layer in changed)
+        offset_x, offset_y = self.__get_canvas_offset()
+        area.queue_draw_area(
+            offset_x + x1, offset_y + y1, x2 - x1, y2 - y1
+        )
+        self.__drawn_layers = layers
+
+    def __expose_area(self, area, event):
+        if not self.__pixbuf:
+            return False
+        canvas_width, canvas_height = self.__get_canvas_size()
+        layers = self.__get_layers(canvas_width, canvas_height)
+        if self.__zoom.done:
+            cairo_filter = _CAIRO_FILTERS[self.__interp_rest]
+        else:
+            cairo_filter = _CAIRO_FILTERS[self.__interp_animation]
+        context = area.window.cairo_create()
+        context.rectangle(
+            event.area.x, event.area.y, event.area.width, event.area.height
+        )
+        context.clip()
+        context.translate(*self.__get_canvas_offset())
+        for pixbuf, x, y, width, height, alpha in layers:
+            context.save()
+            context.translate(x, y)
+            scale_x = float(width) / pixbuf.get_width()
+            scale_y = float(height) / pixbuf.get_height()
+            context.scale(scale_x, scale_y)
+            context.set_source_surface(self.__get_surface(pixbuf), 0, 0)
+            if scale_x != 1.0 or scale_y != 1.0:
+                context.get_source().set_filter(cairo_filter)
+            context.paint_with_alpha(alpha / 255.0)
+            context.restore()
+        self.__drawn_layers = layers
+        return False
+
+    def __refresh(self, animate=True):
+        if not self.__pixbuf:
+            self.__zoom_event = 0
+            return False
+
+        # Move everything to where it should be by now. Frames which could
+        # not be drawn in time are skipped.
+        tweens = (self.__zoom, self.__fade, self.__arrow_fade,
+                  self.__emblem_fade)
+        if animate:
+            now = monotonic()
+            for tween in tweens:
+                tween.step(now)
+        else:
+            for tween in tweens:
+                tween.finish()
+
+        # Intermediate frames are only visible for a moment, so they are
+        # scaled quickly. The frame at rest is scaled in high quality.
+        if self.__zoom.done:
+            interp_type = self.__interp_rest
+        else:
+            interp_type = self.__interp_animation
+        if self.__drawing_area is not None:
+            self.__queue_draw()
+        else:
+            self.__draw(interp_type)
 
-        if (self.__current_size == self.__target_size and
-                self.__arrow_current_alpha == self.__arrow_target_alpha and
-                self.__emblem_current_alpha == self.__emblem_target_alpha and
-                self.__current_alpha == self.__target_alpha):
+        if self.__is_animation_done():
             if self.__zoom_action == ZOOM_ACTION_HIDE:
-                if (self.__arrow_current_alpha > 0 or
-                        self.__emblem_current_alpha > 0):
-                    self.__arrow_target_alpha = 0
-                    self.__emblem_target_alpha = 0
+                if (self.__arrow_fade.value > 0 or
+                        self.__emblem_fade.value > 0):
+                    self.__arrow_fade.target = 0
+                    self.__emblem_fade.target = 0
                     return True
                 else:
-                    if self.__current_size > 1:
-                        self.__target_size = 1
+                    if self.__zoom.value > 1:
+                        self.__zoom.target = 1
                         return True
                     else:
                         gtk.EventBox.hide(self)
             if self.__zoom_action == ZOOM_ACTION_DESTROY:
-                if (self.__arrow_current_alpha > 0 or
-                        self.__emblem_current_alpha > 0):
-                    self.__arrow_target_alpha = 0
-                    self.__emblem_target_alpha = 0
+                if (self.__arrow_fade.value > 0 or
+                        self.__emblem_fade.value > 0):
+                    self.__arrow_fade.target = 0
+                    self.__emblem_fade.target = 0
                     return True
                 else:
-                    if self.__current_size > 1:
-                        self.__target_size = 1
+                    if self.__zoom.value > 1:
+                        self.__zoom.target = 1
                         return True
                     else:
                         gtk.EventBox.destroy(self)
@@ -473,34 +790,6 @@ class Icon(gtk.EventBox, object):
             self.__zoom_event = 0
             return False
 
-        if self.__current_size > self.__target_size:
-            self.__current_size -= 1
-        elif self.__current_size < self.__target_size:
-            self.__current_size += 1
-        if self.__current_alpha > self.__target_alpha:
-            self.__current_alpha = max(
-                self.__target_alpha, self.__current_alpha - 5
-            )
-        elif self.__current_alpha < self.__target_alpha:
-            self.__current_alpha = min(
-                self.__target_alpha, self.__current_alpha + 5
-            )
-        if self.__arrow_current_alpha > self.__arrow_target_alpha:
-            self.__arrow_current_alpha = max(
-                self.__arrow_target_alpha, self.__arrow_current_alpha - 5
-            )
-        elif self.__arrow_current_alpha < self.__arrow_target_alpha:
-            self.__arrow_current_alpha = min(
-                self.__arrow_target_alpha, self.__arrow_current_alpha + 5
-            )
-        if self.__emblem_current_alpha > self.__emblem_target_alpha:
-            self.__emblem_current_alpha = max(
-                self.__emblem_target_alpha, self.__emblem_current_alpha - 5
-            )
-        elif self.__emblem_current_alpha < self.__emblem_target_alpha:
-            self.__emblem_current_alpha = min(
-                self.__emblem_target_alpha, self.__emblem_current_alpha + 5
-            )
         return True
 
 
@@ -530,9 +819,9 @@ class Icon(gtk.EventBox, object):
         self.__update_emblem_target_alpha()
         if not int(self.get_property('visible')):
             self.set_size_request(-1, -1)
-            self.__current_size = 1
-            self.__arrow_current_alpha = 0
-            self.__emblem_current_alpha = 0
+            self.__zoom.value = 1
+            self.__arrow_fade.value = 0
+            self.__emblem_fade.value = 0
             gtk.EventBox.show(self)
         self._refresh()
 
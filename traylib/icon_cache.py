@@ -0,0 +1,345 @@
+from collections import OrderedDict
+import os
+import time
+import tempfile
+import threading
+
+import gtk
+
+from traylib import ICON_THEME, XDG_CACHE_HOME
+from traylib.disk_icon_cache import DiskIconCache
+
+
+class IconCache(object):
+    """
+    Bounded LRU cache for decoded icon pixbufs.
+
+    Entries are keyed by C{(source, size, mtime)}, where C{source} is the path
+    or icon name the pixbuf was loaded from, so a modified file never hits a
+    stale entry. The cache may be used from worker threads.
+    """
+
+    def __init__(self, max_entries=512):
+        """
+        Initialize an IconCache.
+
+        @param max_entries: The maximum number of pixbufs to keep.
+        """
+        self.__entries = OrderedDict()
+        self.__max_entries = max_entries
+        self.__lock = threading.Lock()
+        self.hits = 0
+        """The number of successful lookups."""
+        self.misses = 0
+        """The number of failed lookups."""
+        self.evictions = 0
+        """The number of entries dropped because the cache was full."""
+
+    def get(self, source, size, mtime):
+        """
+        Look up a cached pixbuf.
+
+        @return: The cached C{gtk.gdk.Pixbuf} or C{None}.
+        """
+        key = (source, size, mtime)
+        with self.__lock:
+            try:
+                pixbuf = self.__entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self.__entries[key] = pixbuf
+            self.hits += 1
+            return pixbuf
+
+    def put(self, source, size, mtime, pixbuf):
+        """Add a pixbuf to the cache, evicting the least recently used one."""
+        key = (source, size, mtime)
+        with self.__lock:
+            self.__entries.pop(key, None)
+            self.__entries[key] = pixbuf
+            self.__evict()
+
+    def clear(self):
+        """Drop all cached pixbufs. The counters are kept."""
+        with self.__lock:
+            self.__entries.clear()
+
+    def discard(self, source):
+        """Drop the pixbufs loaded from the given source in all sizes."""
+        with self.__lock:
+            for key in [key for key in self.__entries if key[0] == source]:
+                del self.__entries[key]
+
+    def __evict(self):
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @property
+    def max_entries(self):
+        return self.__max_entries
+
+    @max_entries.setter
+    def max_entries(self, max_entries):
+        with self.__lock:
+            self.__max_entries = max_entries
+            self.__evict()
+
+    @property
+    def stats(self):
+        """A dict with the hit, miss and eviction counters."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.__entries),
+        }
+
+
+class IconLookupIndex(object):
+    """
+    Memoizes C{ICON_THEME.lookup_icon()}, mapping C{(icon_name, size)} to the
+    resolved filename. Icons that could not be found are remembered as well.
+
+    The index is invalidated when the icon theme changes and rebuilt lazily
+    by the following lookups.
+    """
+
+    def __init__(self):
+        """Initialize an IconLookupIndex."""
+        self.__filenames = {}
+        self.__native_sizes = {}
+        self.__stale = False
+
+    def lookup(self, icon_name, size):
+        """
+        Look up an icon in the theme.
+
+        @param icon_name: The name of the icon.
+        @param size: The requested size.
+
+        @return: The filename of the icon or C{None}.
+        """
+        self.__refresh()
+        key = (icon_name, size)
+        try:
+            return self.__filenames[key]
+        except KeyError:
+            pass
+        icon_info = ICON_THEME.lookup_icon(icon_name, size, 0)
+        filename = icon_info.get_filename() if icon_info else None
+        self.__filenames[key] = filename
+        return filename
+
+    def native_size(self, icon_name, size):
+        """
+        Find the size the theme provides the given icon in that is nearest
+        to the requested size.
+
+        @param icon_name: The name of the icon.
+        @param size: The requested size.
+
+        @return: The native size, or C{size} if the icon is scalable or not
+            in the theme.
+        """
+        self.__refresh()
+        try:
+            sizes = self.__native_sizes[icon_name]
+        except KeyError:
+            sizes = self.__native_sizes[icon_name] = (
+                ICON_THEME.get_icon_sizes(icon_name)
+            )
+        if not sizes or -1 in sizes:
+            return size
+        return min(sizes, key=lambda s: (abs(s - size), -s))
+
+    def invalidate(self):
+        """Mark the index as stale, so it is rebuilt on the next lookup."""
+        self.__stale = True
+
+    def __refresh(self):
+        if self.__stale:
+            self.__filenames.clear()
+            self.__native_sizes.clear()
+            self.__stale = False
+
+    def __len__(self):
+        return len(self.__filenames)
+
+
+class NegativeCache(object):
+    """
+    Remembers paths icons could not be loaded from.
+
+    Within the time to live, a path is reported as missing without touching
+    the file system. After that, the entry is revalidated by comparing the
+    mtimes of the path and its parent directory with the ones recorded when
+    loading failed. If there are more than C{max_entries} paths, the least
+    recently used ones are forgotten.
+    """
+
+    def __init__(self, ttl=30.0, max_entries=1024):
+        """
+        Initialize a NegativeCache.
+
+        @param ttl: The time (in seconds) an entry is trusted without
+            revalidating it.
+        @param max_entries: The maximum number of paths to remember.
+        """
+        self.__ttl = ttl
+        self.__max_entries = max_entries
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def is_missing(self, path):
+        """
+        @return: C{True} if loading from the given path failed before and
+            it has not changed since.
+        """
+        with self.__lock:
+            try:
+                expires, stamp = self.__entries.pop(path)
+            except KeyError:
+                return False
+            # Re-inserted below, as the most recently used entry.
+        now = time.time()
+        if now >= expires:
+            if _get_stamp(path) != stamp:
+                return False
+            expires = now + self.__ttl
+        self.__put(path, expires, stamp)
+        return True
+
+    def add(self, path):
+        """Remember that loading from the given path failed."""
+        self.__put(path, time.time() + self.__ttl, _get_stamp(path))
+
+    def clear(self):
+        """Forget all paths."""
+        with self.__lock:
+            self.__entries.clear()
+
+    def __put(self, path, expires, stamp):
+        with self.__lock:
+            self.__entries.pop(path, None)
+            self.__entries[path] = (expires, stamp)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+def _get_stamp(path):
+    stamp = []
+    for p in (os.path.dirname(path), path):
+        try:
+            stamp.append(os.stat(p).st_mtime)
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+ICON_CACHE = IconCache()
+"""The L{IconCache} shared by all L{IIconLoader}s."""
+
+WINDOW_CLASS_ICON_CACHE = IconCache(max_entries=128)
+"""
+The L{IconCache} of window icons, keyed by window class, icon name and
+whether the size was snapped. See L{WindowItem.get_icon_class_key}.
+"""
+
+ICON_LOOKUP = IconLookupIndex()
+"""The L{IconLookupIndex} shared by all L{IIconLoader}s."""
+
+MISSING_ICONS = NegativeCache()
+"""The L{NegativeCache} of paths icons could not be loaded from."""
+
+PERSISTENT_ICON_CACHE = DiskIconCache(
+    os.path.join(XDG_CACHE_HOME, 'traylib', 'icons')
+)
+"""
+The persistent cache consulted when L{ICON_CACHE} misses. Use
+L{set_persistent_icon_cache} to replace it.
+
+Processes using the same cache directory share the scaled icons on disk, but
+not in memory: PyGTK can only create pixbufs from strings, which
+C{gtk.gdk.pixbuf_new_from_data} copies, so every process has its own copy of
+each decoded icon.
+"""
+
+
+def set_persistent_icon_cache(cache):
+    """
+    Replace the persistent icon cache.
+
+    @param cache: A L{DiskIconCache} (or an object with the same interface)
+        or C{None} to disable the persistent cache.
+    """
+    global PERSISTENT_ICON_CACHE
+    PERSISTENT_ICON_CACHE = cache
+    if cache is not None:
+        cache.theme_name = _get_theme_name()
+
+
+ICON_SIZES_FILE = os.path.join(XDG_CACHE_HOME, 'traylib', 'icon-sizes')
+"""The file the icon sizes recently loaded by trays are recorded in."""
+
+MAX_RECORDED_ICON_SIZES = 4
+"""The number of icon sizes kept in L{ICON_SIZES_FILE}."""
+
+
+def record_icon_size(size):
+    """
+    Record an icon size loaded by a tray, so C{python -m traylib.warm_cache}
+    fills the persistent icon cache in that size. Only the most recently
+    recorded sizes are kept.
+    """
+    sizes = get_recorded_icon_sizes()
+    if sizes and sizes[-1] == size:
+        return
+    if size in sizes:
+        sizes.remove(size)
+    sizes = (sizes + [size])[-MAX_RECORDED_ICON_SIZES:]
+    directory = os.path.dirname(ICON_SIZES_FILE)
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmp_filename = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            f.write(' '.join(str(s) for s in sizes) + '\n')
+        os.rename(tmp_filename, ICON_SIZES_FILE)
+    except (IOError, OSError):
+        pass
+
+
+def get_recorded_icon_sizes():
+    """
+    @return: The icon sizes recorded by L{record_icon_size}, least recently
+        recorded first.
+    """
+    try:
+        with open(ICON_SIZES_FILE) as f:
+            return [int(s) for s in f.read().split()]
+    except (IOError, OSError, ValueError):
+        return []
+
+
+def _get_theme_name():
+    return gtk.settings_get_default().get_property('gtk-icon-theme-name')
+
+
+def flush_icon_caches():
+    """Flush the icon caches after the icon theme has changed."""
+    ICON_CACHE.clear()
+    WINDOW_CLASS_ICON_CACHE.clear()
+    ICON_LOOKUP.invalidate()
+    MISSING_ICONS.clear()
+    if PERSISTENT_ICON_CACHE is not None:
+        PERSISTENT_ICON_CACHE.theme_name = _get_theme_name()
+
+PERSISTENT_ICON_CACHE.theme_name = _get_theme_name()
@@ -29,6 +29,42 @@ class IconConfig(Config):
 
     locked = Attribute(default=True)
     """If C{True}, the icons cannot be moved within their box."""
+
+    async_icons = Attribute(default=False)
+    """
+    If C{True}, icons are decoded in worker threads. Until they are loaded,
+    the previous pixbuf or a placeholder is shown.
+    """
+
+    snap_icon_sizes = Attribute(default=False)
+    """
+    If C{True}, themed icons are loaded in the theme's native size nearest
+    to the icon size, and the L{Icon} scales them when compositing.
+    """
+
+    interp_animation = Attribute(default=gtk.gdk.INTERP_NEAREST)
+    """
+    The C{gtk.gdk.INTERP_*} type used to scale the intermediate frames of
+    zoom animations.
+    """
+
+    interp_rest = Attribute(default=gtk.gdk.INTERP_BILINEAR)
+    """
+    The C{gtk.gdk.INTERP_*} type used to scale icons at rest, for example
+    C{gtk.gdk.INTERP_HYPER} for the best quality.
+    """
+
+    max_fps = Attribute(default=60)
+    """
+    The maximum number of animation frames per second. All icons are
+    animated by the same L{AnimationClock}.
+    """
+
+    direct_drawing = Attribute(default=False)
+    """
+    If C{True}, icons are drawn with cairo, and animation frames only redraw
+    the area that has changed (see L{Icon.direct_drawing}).
+    """
     
     vertical = property(lambda self: self.edge in (LEFT, RIGHT))
     """
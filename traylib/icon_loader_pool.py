@@ -0,0 +1,158 @@
+import threading
+import traceback
+import Queue
+
+import gobject
+
+from traylib import pixbuf_helper
+from traylib.icons import FileIcon
+
+
+class IconLoaderPool(object):
+    """
+    Decodes icons on a small pool of worker threads, so slow file systems do
+    not block the main loop.
+
+    Only loaders with a path are decoded in the workers. Loaders without a
+    path (like L{PixbufIcon}s) are tried in the main loop, as they do not
+    need to touch the disk.
+    """
+
+    def __init__(self, workers=2):
+        """
+        Initialize an IconLoaderPool.
+
+        @param workers: The number of worker threads.
+        """
+        self.__workers = workers
+        self.__queue = Queue.Queue()
+        self.__threads = []
+
+    def load_icon(self, item, size, callback, snap=False):
+        """
+        Load the icon of an L{Item} in the background.
+
+        @param item: The L{Item} whose icon should be loaded.
+        @param size: The size of the icon.
+        @param callback: Called in the main loop with the scaled
+            C{gtk.gdk.Pixbuf} (or C{None}) when loading has finished.
+        @param snap: If C{True}, the icon is loaded in its nearest native
+            size and not scaled (see L{Item.get_icon}).
+        """
+        pixbuf = item.get_cached_icon(size, snap)
+        if pixbuf is not None:
+            callback(pixbuf)
+            return
+        self.__load_next(
+            item, item.get_icon_loaders(size, snap), size, snap, callback
+        )
+
+    def run_async(self, functions, callback, timeout=None):
+        """
+        Call the given functions in the worker threads, without waiting for
+        them.
+
+        @param functions: A list of callables without arguments.
+        @param callback: Called once in the main loop, without arguments,
+            when all functions have returned or when the timeout has
+            expired, whichever happens first.
+        @param timeout: The maximum time to wait for the functions (in
+            seconds) before calling C{callback}, or C{None}. Functions which
+            have not returned by then keep running in the background.
+        """
+        lock = threading.Lock()
+        class state:
+            pending = len(functions)
+            done = False
+            timeout_event = 0
+        def finish():
+            # Only called in the main loop.
+            if not state.done:
+                state.done = True
+                if state.timeout_event:
+                    gobject.source_remove(state.timeout_event)
+                callback()
+            return False
+        def wrap(function):
+            def run():
+                try:
+                    function()
+                finally:
+                    with lock:
+                        state.pending -= 1
+                        if state.pending == 0:
+                            gobject.idle_add(finish)
+            return run
+        if not functions:
+            gobject.idle_add(finish)
+            return
+        if timeout is not None:
+            state.timeout_event = gobject.timeout_add(
+                int(timeout * 1000), finish
+            )
+        self.__start()
+        for function in functions:
+            self.__queue.put(wrap(function))
+
+    def __start(self):
+        if self.__threads:
+            return
+        for i in range(self.__workers):
+            thread = threading.Thread(target=self.__run)
+            thread.daemon = True
+            thread.start()
+            self.__threads.append(thread)
+
+    def __run(self):
+        while True:
+            function = self.__queue.get()
+            try:
+                function()
+            except Exception:
+                traceback.print_exc()
+
+    def __load_next(self, item, loaders, size, snap, callback):
+        """
+        Try the next loaders of the given iterator, until one of them needs
+        to be decoded in a worker thread.
+        """
+        # Resolve the paths here, icon theme lookups are not thread-safe.
+        for icon in loaders:
+            load_size = icon.get_native_size(size) if snap else size
+            path = icon.get_path(load_size)
+            if path is None:
+                # Nothing to decode, so try it right away.
+                pixbuf = icon.get_pixbuf(load_size)
+                if pixbuf is not None:
+                    self.__finish(item, icon, pixbuf, size, snap, callback)
+                    return
+                continue
+
+            def load(icon=icon, load_size=load_size, path=path):
+                pixbuf = FileIcon(path).get_pixbuf(load_size)
+                gobject.idle_add(
+                    self.__loaded, item, icon, loaders, pixbuf, size, snap,
+                    callback
+                )
+
+            self.__start()
+            self.__queue.put(load)
+            return
+        callback(None)
+
+    def __loaded(self, item, icon, loaders, pixbuf, size, snap, callback):
+        if pixbuf is None:
+            self.__load_next(item, loaders, size, snap, callback)
+        else:
+            self.__finish(item, icon, pixbuf, size, snap, callback)
+        return False
+
+    def __finish(self, item, icon, pixbuf, size, snap, callback):
+        if not snap:
+            pixbuf = pixbuf_helper.scale_pixbuf_to_size(pixbuf, size)
+        item.icon_loaded(icon, size, snap, pixbuf)
+        callback(pixbuf)
+
+
+ICON_LOADER_POOL = IconLoaderPool()
+"""The L{IconLoaderPool} used for asynchronous icon loading."""
@@ -0,0 +1,50 @@
+from traylib.icons import FileIcon
+from traylib.icon_loader_pool import ICON_LOADER_POOL
+
+
+def prefetch_icons(items, size, callback, snap=False, timeout=None):
+    """
+    Decode the icons of the given items in the worker threads of the
+    L{IconLoaderPool}, so the icon caches are warm when the items' icons
+    are updated. This does not block the main loop.
+
+    For every item, the file-based loaders at the start of its
+    L{Item.get_icons} chain are tried in order until one succeeds. Identical
+    chains are only loaded once.
+
+    @param items: The L{Item}s whose icons should be prefetched.
+    @param size: The size of the icons.
+    @param callback: Called in the main loop, without arguments, when the
+        icons have been decoded or the timeout has expired.
+    @param snap: If C{True}, the icons are prefetched in their nearest
+        native sizes (see L{Item.get_icon}).
+    @param timeout: The maximum time to wait for the icons before calling
+        C{callback} (in seconds), or C{None}. The rest is decoded in the
+        background.
+    """
+    chains = []
+    seen = set()
+    for item in items:
+        paths = []
+        for icon in item.get_icons():
+            load_size = icon.get_native_size(size) if snap else size
+            # Loaders without a path have nothing to decode.
+            path = icon.get_path(load_size)
+            if path is None:
+                break
+            paths.append((path, load_size))
+        paths = tuple(paths)
+        if paths and paths not in seen:
+            seen.add(paths)
+            chains.append(paths)
+
+    def load(paths):
+        def load():
+            for path, load_size in paths:
+                if FileIcon(path).get_pixbuf(load_size) is not None:
+                    break
+        return load
+
+    ICON_LOADER_POOL.run_async(
+        [load(paths) for paths in chains], callback, timeout
+    )
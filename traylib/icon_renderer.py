@@ -1,7 +1,12 @@
 import gtk
-import gobject
 
 from traylib.icon import Icon
+from traylib.icons import ThemedIcon
+from traylib.icon_loader_pool import ICON_LOADER_POOL
+from traylib.animation import ANIMATION_CLOCK
+
+
+_placeholder = ThemedIcon("image-loading")
 
 
 def render_icon(item, icon_config):
@@ -24,10 +29,35 @@ def render_icon(item, icon_config):
         update_icon(item)
         icon.size = icon_config.size
 
+    def update_interp_animation(icon_config):
+        icon.interp_animation = icon_config.interp_animation
+
+    def update_interp_rest(icon_config):
+        icon.interp_rest = icon_config.interp_rest
+
+    def update_icon_loading(icon_config):
+        update_icon(item)
+
+    def update_max_fps(icon_config):
+        ANIMATION_CLOCK.fps = icon_config.max_fps
+
+    def update_direct_drawing(icon_config):
+        icon.direct_drawing = icon_config.direct_drawing
+
     icon_config_handlers = [
         icon_config.connect("edge-changed", update_edge),
         icon_config.connect("effects-changed", update_effects),
         icon_config.connect("size-changed", update_size),
+        icon_config.connect(
+            "interp-animation-changed", update_interp_animation
+        ),
+        icon_config.connect("interp-rest-changed", update_interp_rest),
+        icon_config.connect("snap-icon-sizes-changed", update_icon_loading),
+        icon_config.connect("async-icons-changed", update_icon_loading),
+        icon_config.connect("max-fps-changed", update_max_fps),
+        icon_config.connect(
+            "direct-drawing-changed", update_direct_drawing
+        ),
     ]
 
     class state:
@@ -35,16 +65,36 @@ def render_icon(item, icon_config):
         menu_visible = False
         arrow_blink_event = 0
         button_pressed = False
+        icon_request = 0
 
     def update_name(item):
         icon.tooltip = item.get_name()
 
-    def update_icon(item):
-        pixbuf = item.get_icon(int(icon_config.size * 1.5))
+    def set_pixbuf(pixbuf):
         if pixbuf is not None:
             icon.pixbuf = pixbuf
             icon.alpha = 128 if item.is_greyed_out() else 255
 
+    def update_icon(item):
+        size = int(icon_config.size * 1.5)
+        state.icon_request += 1
+        if not icon_config.async_icons:
+            set_pixbuf(item.get_icon(size, icon_config.snap_icon_sizes))
+            return
+        request = state.icon_request
+        def icon_loaded(pixbuf):
+            # Drop the result if the icon has changed in the meantime.
+            if request == state.icon_request:
+                set_pixbuf(pixbuf)
+        if icon.pixbuf is None:
+            set_pixbuf(_placeholder.get_pixbuf(size))
+        else:
+            # Keep showing the last known pixbuf.
+            icon.alpha = 128 if item.is_greyed_out() else 255
+        ICON_LOADER_POOL.load_icon(
+            item, size, icon_loaded, icon_config.snap_icon_sizes
+        )
+
     def update_emblem(item):
         icon.emblem = item.get_emblem()
 
@@ -80,7 +130,9 @@ def render_icon(item, icon_config):
     def update_arrow_blinking(item):
         if item.is_arrow_blinking():
             if state.arrow_blink_event == 0:
-                state.arrow_blink_event = gobject.timeout_add(500, blink_arrow)
+                state.arrow_blink_event = ANIMATION_CLOCK.add(
+                    blink_arrow, 500
+                )
         else:
             state.arrow_blink_event = 0
 
@@ -152,6 +204,7 @@ def render_icon(item, icon_config):
         context.set_icon_pixbuf(item.get_icon(48), 0,0)
 
     def on_destroy(icon):
+        state.icon_request += 1
         for handler in icon_config_handlers:
             icon_config.disconnect(handler)
         for handler in item_handlers:
@@ -166,6 +219,10 @@ def render_icon(item, icon_config):
 
     update_edge(icon_config)
     update_effects(icon_config)
+    update_interp_animation(icon_config)
+    update_interp_rest(icon_config)
+    update_max_fps(icon_config)
+    update_direct_drawing(icon_config)
     update_size(icon_config)
     update_name(item)
     update_icon(item)
@@ -0,0 +1,60 @@
+import weakref
+
+import gobject
+
+from traylib import ICON_THEME
+from traylib.icon_cache import flush_icon_caches
+
+
+class IconThemeDispatcher(object):
+    """
+    Reacts to icon theme changes on behalf of all L{Item}s.
+
+    When the theme changes, the icon caches are flushed once and the items
+    are told to reload their icons in small batches during idle time,
+    visible items first.
+    """
+
+    def __init__(self, icon_theme, batch_size=8):
+        """
+        Initialize an IconThemeDispatcher.
+
+        @param icon_theme: The C{gtk.IconTheme} to watch.
+        @param batch_size: The number of items reloaded per idle iteration.
+        """
+        self.__items = weakref.WeakSet()
+        self.__pending = []
+        self.__batch_size = batch_size
+        self.__idle_event = 0
+        icon_theme.connect("changed", self.__theme_changed)
+
+    def add_item(self, item):
+        """Reload the icon of the given L{Item} when the theme changes."""
+        self.__items.add(item)
+
+    def remove_item(self, item):
+        """Stop reloading the icon of the given L{Item}."""
+        self.__items.discard(item)
+
+    def __theme_changed(self, icon_theme):
+        flush_icon_caches()
+        items = list(self.__items)
+        items.sort(key=lambda item: not item.is_visible())
+        self.__pending = items
+        if self.__idle_event == 0:
+            self.__idle_event = gobject.idle_add(self.__reload)
+
+    def __reload(self):
+        batch = self.__pending[:self.__batch_size]
+        del self.__pending[:self.__batch_size]
+        for item in batch:
+            if item in self.__items:
+                item.changed("icon")
+        if self.__pending:
+            return True
+        self.__idle_event = 0
+        return False
+
+
+ICON_THEME_DISPATCHER = IconThemeDispatcher(ICON_THEME)
+"""The L{IconThemeDispatcher} all L{Item}s are registered with."""
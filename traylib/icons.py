@@ -1,7 +1,50 @@
+import os
+
 import gobject
 import gtk
 
-from traylib import ICON_THEME
+from traylib import icon_cache
+from traylib.icon_cache import ICON_CACHE, ICON_LOOKUP, MISSING_ICONS
+from traylib.pixbuf_intern import PIXBUF_INTERN_TABLE
+
+
+def _load_pixbuf(path, size):
+    """
+    Load a pixbuf from a file, using the shared L{ICON_CACHE} and the
+    persistent icon cache.
+
+    The image is decoded directly at the given size, keeping its aspect
+    ratio, so no full-size buffer is allocated and SVGs are rendered at
+    exactly that size.
+
+    Paths that could not be loaded are remembered in L{MISSING_ICONS}, so
+    they are not tried again on every refresh.
+
+    @return: The loaded C{gtk.gdk.Pixbuf} or C{None}.
+    """
+    if MISSING_ICONS.is_missing(path):
+        return None
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        MISSING_ICONS.add(path)
+        return None
+    pixbuf = ICON_CACHE.get(path, size, mtime)
+    if pixbuf is not None:
+        return pixbuf
+    persistent_cache = icon_cache.PERSISTENT_ICON_CACHE
+    if persistent_cache is not None:
+        pixbuf = persistent_cache.get(path, mtime, size)
+    if pixbuf is None:
+        try:
+            pixbuf = gtk.gdk.pixbuf_new_from_file_at_size(path, size, size)
+        except gobject.GError:
+            MISSING_ICONS.add(path)
+            return None
+        if persistent_cache is not None:
+            persistent_cache.put(path, mtime, size, pixbuf)
+    ICON_CACHE.put(path, size, mtime, pixbuf)
+    return pixbuf
 
 
 class IIconLoader(object):
@@ -14,6 +57,25 @@ class IIconLoader(object):
     def get_path(self, size):
         """@return: the path of the icon or None."""
 
+    def get_native_size(self, size):
+        """
+        @return: The size nearest to C{size} the icon can be loaded in
+            without scaling it.
+        """
+        return size
+
+    # Loaders are equal if they load the same icon, so a chain built again
+    # by Item.get_icons() can be compared with a remembered loader.
+
+    def __eq__(self, other):
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self),) + tuple(sorted(vars(self).items())))
+
 
 class ThemedIcon(IIconLoader):
     """Loads themed icons."""
@@ -28,35 +90,41 @@ class ThemedIcon(IIconLoader):
         """The name of the icon."""
 
     def get_pixbuf(self, size):
-        icon_info = ICON_THEME.lookup_icon(self.icon_name, size, 0)
-        if not icon_info:
-            return None
-        icon_path = icon_info.get_filename()
-        try:
-            return gtk.gdk.pixbuf_new_from_file(icon_path)
-        except gobject.GError:
+        icon_path = ICON_LOOKUP.lookup(self.icon_name, size)
+        if icon_path is None:
             return None
+        return _load_pixbuf(icon_path, size)
 
     def get_path(self, size):
-        icon_info = ICON_THEME.lookup_icon(self.icon_name, size, 0)
-        if not icon_info:
-            return None
-        return icon_info.get_filename()
+        return ICON_LOOKUP.lookup(self.icon_name, size)
+
+    def get_native_size(self, size):
+        return ICON_LOOKUP.native_size(self.icon_name, size)
 
 
 class PixbufIcon(IIconLoader):
-    """Wraps an already existing gtk.gdk.Pixbuf."""
+    """
+    Wraps an already existing gtk.gdk.Pixbuf.
+
+    Identical pixbufs and their scaled variants are shared through the
+    L{PIXBUF_INTERN_TABLE}.
+    """
 
     def __init__(self, pixbuf):
         """
         Initialize PixbufIcon.
 
-        @param pixbuf: The gtk.gdk.Pixbuf get_pixbuf() will return.
+        @param pixbuf: The gtk.gdk.Pixbuf get_pixbuf() will return, scaled
+            to the requested size.
         """
+        if pixbuf is not None:
+            pixbuf = PIXBUF_INTERN_TABLE.intern(pixbuf)
         self.pixbuf = pixbuf
 
     def get_pixbuf(self, size):
-        return self.pixbuf
+        if self.pixbuf is None:
+            return None
+        return PIXBUF_INTERN_TABLE.get_scaled(self.pixbuf, size)
 
     def get_path(self, size):
         return None
@@ -74,10 +142,7 @@ class FileIcon(IIconLoader):
         self.path = path
 
     def get_pixbuf(self, size):
-        try:
-            return gtk.gdk.pixbuf_new_from_file(self.path)
-        except gobject.GError:
-            return None
+        return _load_pixbuf(self.path, size)
 
     def get_path(self, size):
         return self.path
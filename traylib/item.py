@@ -1,17 +1,19 @@
 import gtk
 import gobject
 
-from traylib import ICON_THEME, pixbuf_helper
+from traylib import pixbuf_helper
+from traylib.icon_cache import ICON_LOOKUP
+from traylib.icon_theme_dispatcher import ICON_THEME_DISPATCHER
 
 
 class Item(gobject.GObject):
 
     def __init__(self):
         gobject.GObject.__init__(self)
-        self.__icon_theme_changed_handler = ICON_THEME.connect(
-            "changed", self.__theme_changed
-        )
+        ICON_THEME_DISPATCHER.add_item(self)
         self.__is_destroyed = False
+        self.__icon_loaders = {}
+        self.connect("changed", self.__changed)
 
     def changed(self, *props):
         self.emit("changed", set(props))
@@ -20,11 +22,12 @@ class Item(gobject.GObject):
         if self.__is_destroyed:
             return
         self.__is_destroyed = True
-        ICON_THEME.disconnect(self.__icon_theme_changed_handler)
+        ICON_THEME_DISPATCHER.remove_item(self)
         self.emit("destroyed")
 
-    def __theme_changed(self, icon_theme):
-        self.changed("icon")
+    def __changed(self, item, props):
+        if "icon" in props:
+            self.__icon_loaders.clear()
 
     def is_visible(self):
         """
@@ -51,26 +54,88 @@ class Item(gobject.GObject):
         """
         return ""
 
-    def get_icon(self, size):
+    def get_icon(self, size, snap=False):
         """
         This determines the C{gtk.gdk.Pixbuf} the C{Item} should have.
 
         This method tries to use the L{IIconLoader}s returned by
-        L{Item.get_icons} to load the pixbuf.
+        L{Item.get_icons} to load the pixbuf. The loader that succeeded is
+        remembered for each size and tried first next time, until the
+        C{Item} emits an "icon" change (which it also does when the icon
+        theme changes).
+
+        @param size: The size of the icon.
+        @param snap: If C{True}, the icon is loaded in the native size
+            nearest to C{size} (see L{IIconLoader.get_native_size}) and not
+            scaled.
 
         @return: The new pixbuf.
         """
-        for icon in self.get_icons():
-            pixbuf = icon.get_pixbuf(size)
+        pixbuf = self.get_cached_icon(size, snap)
+        if pixbuf is not None:
+            return pixbuf
+        for icon in self.get_icon_loaders(size, snap):
+            pixbuf = self.__load_icon(icon, size, snap)
             if pixbuf is not None:
-                return pixbuf_helper.scale_pixbuf_to_size(pixbuf, size)
+                self.icon_loaded(icon, size, snap, pixbuf)
+                return pixbuf
+        self.__icon_loaders.pop((size, snap), None)
+        return None
+
+    def get_icon_loaders(self, size, snap=False):
+        """
+        Generate the L{IIconLoader}s L{get_icon} tries, in order. The loader
+        which succeeded last time comes first, and L{get_icons} is only
+        called if it fails.
+        """
+        remembered = self.__icon_loaders.get((size, snap))
+        if remembered is not None:
+            yield remembered
+        for icon in self.get_icons():
+            if icon != remembered:
+                yield icon
+
+    def icon_loaded(self, icon, size, snap, pixbuf):
+        """
+        Called when an icon has been loaded, by L{get_icon} or
+        asynchronously. Remembers the loader which succeeded and calls
+        L{cache_icon}.
+
+        @param icon: The L{IIconLoader} which succeeded.
+        @param pixbuf: The loaded (and scaled) pixbuf.
+        """
+        self.__icon_loaders[(size, snap)] = icon
+        self.cache_icon(size, snap, pixbuf)
+
+    def get_cached_icon(self, size, snap=False):
+        """
+        Override this to share loaded icons, for example between items of
+        the same kind.
+
+        @return: The pixbuf for the given size, or C{None} if it has to be
+            loaded.
+        """
         return None
 
+    def cache_icon(self, size, snap, pixbuf):
+        """
+        Override this to store a loaded pixbuf, so L{get_cached_icon} can
+        return it later.
+        """
+        pass
+
+    def __load_icon(self, icon, size, snap):
+        if snap:
+            return icon.get_pixbuf(icon.get_native_size(size))
+        pixbuf = icon.get_pixbuf(size)
+        if pixbuf is None:
+            return None
+        return pixbuf_helper.scale_pixbuf_to_size(pixbuf, size)
+
     def find_icon_name(self):
         for icon in self.get_icons():
             if hasattr(icon, "icon_name"):
-                icon_info = ICON_THEME.lookup_icon(icon.icon_name, 48, 0)
-                if icon_info is not None:
+                if ICON_LOOKUP.lookup(icon.icon_name, 48) is not None:
                     return icon.icon_name
         return ""
 
@@ -103,6 +103,13 @@ class Main(object):
         return render_icon(item, self.__icon_config)
 
     def item_from_uri(self, item_box, uri):
+        """
+        Override this to create an L{Item} from a URI dropped on an
+        L{ItemBox}. Use L{traylib.appdir_index.APPDIR_INDEX} to look up
+        AppDirs instead of searching C{APPDIRPATH}.
+
+        @return: The new L{Item} or C{None}.
+        """
         return None
 
     def options_changed(self):
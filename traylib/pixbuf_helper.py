@@ -1,7 +1,75 @@
+from collections import OrderedDict
+import weakref
+
 import gtk
 
 
-def scale_pixbuf_to_size(pixbuf, size, scale_up=True):
+class TransformCache(object):
+    """
+    Memoizes pixbuf transformations, keyed by the source pixbuf, the
+    operation and its parameters.
+
+    The results for a source pixbuf are dropped as soon as the source
+    pixbuf itself goes away. Cached results are shared, so they must not be
+    modified.
+    """
+
+    def __init__(self, max_results=None):
+        """
+        Initialize a TransformCache.
+
+        @param max_results: The maximum number of results kept per source
+            pixbuf, or C{None} for no limit. If there are more, the least
+            recently used ones are dropped.
+        """
+        self.__max_results = max_results
+        self.__results = weakref.WeakKeyDictionary()
+        self.hits = 0
+        """The number of transformations served from the cache."""
+        self.misses = 0
+        """The number of transformations actually performed."""
+
+    def transform(self, pixbuf, operation, *params):
+        """
+        @param pixbuf: The source pixbuf.
+        @param operation: A function called with the source pixbuf and
+            C{params} to create the transformed pixbuf.
+
+        @return: The transformed pixbuf.
+        """
+        try:
+            results = self.__results[pixbuf]
+        except KeyError:
+            results = self.__results[pixbuf] = OrderedDict()
+        key = (operation, params)
+        try:
+            result = results.pop(key)
+        except KeyError:
+            self.misses += 1
+            result = operation(pixbuf, *params)
+        else:
+            self.hits += 1
+        # (Re-)insert the result as the most recently used one.
+        results[key] = result
+        if self.__max_results is not None:
+            while len(results) > self.__max_results:
+                results.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Drop all cached results."""
+        self.__results.clear()
+
+    def __len__(self):
+        return len(self.__results)
+
+
+TRANSFORM_CACHE = TransformCache()
+"""The L{TransformCache} used by the functions in this module."""
+
+
+def scale_pixbuf_to_size(pixbuf, size, scale_up=True, cache=True,
+                         interp_type=gtk.gdk.INTERP_TILES):
     """
     Scale a pixbuf to the given size. 
     
@@ -9,28 +77,43 @@ def scale_pixbuf_to_size(pixbuf, size, scale_up=True):
     @param size: The size of the scaled pixbuf.
     @param scale_up: If False, it is only scaled down if too large and not 
         scaled up.
+    @param cache: If False, the result is not stored in the
+        L{TRANSFORM_CACHE}. Use this for results the caller caches itself.
+    @param interp_type: The interpolation type used for scaling.
 
     @return: A pixbuf scaled to the given size.
     """
     size = int(size)
+    width = pixbuf.get_width()
+    height = pixbuf.get_height()
+    largest = max(width, height)
+    if largest == size or largest < size and not scale_up:
+        return pixbuf
+    if not cache:
+        return _scale(pixbuf, size, interp_type)
+    return TRANSFORM_CACHE.transform(pixbuf, _scale, size, interp_type)
+
+
+def _scale(pixbuf, size, interp_type):
     width = pixbuf.get_width()
     height = pixbuf.get_height()
     if width > height:
         ratio = float(height) / float(width)
-        if width > size or (width < size and scale_up):
-            pixbuf = pixbuf.scale_simple(
-                size, max(1, int(size*ratio)), gtk.gdk.INTERP_TILES
-            )
+        return pixbuf.scale_simple(
+            size, max(1, int(size*ratio)), interp_type
+        )
     else:
         ratio = float(width) / float(height)
-        if height > size or (height < size and scale_up):
-            pixbuf = pixbuf.scale_simple(
-                max(1, int(size*ratio)), size, gtk.gdk.INTERP_TILES
-            )
-    return pixbuf
+        return pixbuf.scale_simple(
+            max(1, int(size*ratio)), size, interp_type
+        )
 
 
 def convert_to_greyscale(pixbuf):
+    return TRANSFORM_CACHE.transform(pixbuf, _convert_to_greyscale)
+
+
+def _convert_to_greyscale(pixbuf):
     dest_pixbuf = gtk.gdk.Pixbuf(
         pixbuf.get_colorspace(),
         pixbuf.get_has_alpha(),
@@ -43,6 +126,10 @@ def convert_to_greyscale(pixbuf):
 
 
 def change_alpha(pixbuf, alpha):
+    return TRANSFORM_CACHE.transform(pixbuf, _change_alpha, alpha)
+
+
+def _change_alpha(pixbuf, alpha):
     dest_pixbuf = gtk.gdk.Pixbuf(
         pixbuf.get_colorspace(),
         pixbuf.get_has_alpha(),
@@ -0,0 +1,85 @@
+import hashlib
+import weakref
+
+from traylib.pixbuf_helper import scale_pixbuf_to_size
+
+
+class PixbufInternTable(object):
+    """
+    Stores identical pixbufs only once.
+
+    Pixbufs are identified by a hash of their pixels. The hash of a given
+    pixbuf object is remembered, so it is only computed once per object.
+    Scaled variants of interned pixbufs are shared as well. Entries go away
+    when no one uses them anymore.
+    """
+
+    def __init__(self):
+        """Initialize a PixbufInternTable."""
+        self.__pixbufs = weakref.WeakValueDictionary()
+        self.__scaled = weakref.WeakValueDictionary()
+        self.__digests = weakref.WeakKeyDictionary()
+        # Maps the pixbufs passed to get_scaled() to the sizes they have
+        # been counted in saved_bytes for.
+        self.__scaled_sizes = weakref.WeakKeyDictionary()
+        self.saved_bytes = 0
+        """
+        The number of bytes not allocated because an identical pixbuf had
+        already been interned. Every duplicate pixbuf object is counted
+        once, as is every scaled variant shared by another pixbuf object.
+        """
+
+    def intern(self, pixbuf):
+        """
+        @return: The interned pixbuf identical to the given one.
+        """
+        is_new = pixbuf not in self.__digests
+        digest = self.__digest(pixbuf)
+        interned = self.__pixbufs.get(digest)
+        if interned is None:
+            self.__pixbufs[digest] = interned = pixbuf
+        elif is_new and interned is not pixbuf:
+            self.saved_bytes += _get_size(pixbuf)
+        return interned
+
+    def get_scaled(self, pixbuf, size):
+        """
+        @return: The interned pixbuf identical to the given one, scaled to
+            the given size.
+        """
+        sizes = self.__scaled_sizes.setdefault(pixbuf, set())
+        pixbuf = self.intern(pixbuf)
+        key = (self.__digests[pixbuf], size)
+        scaled = self.__scaled.get(key)
+        if scaled is None:
+            self.__scaled[key] = scaled = scale_pixbuf_to_size(pixbuf, size)
+        elif size not in sizes:
+            self.saved_bytes += _get_size(scaled)
+        sizes.add(size)
+        return scaled
+
+    def __digest(self, pixbuf):
+        try:
+            return self.__digests[pixbuf]
+        except KeyError:
+            pass
+        digest = hashlib.md5(
+            '%d %d %d %d %d ' % (
+                pixbuf.get_width(), pixbuf.get_height(),
+                pixbuf.get_rowstride(), pixbuf.get_has_alpha(),
+                pixbuf.get_n_channels(),
+            ) + pixbuf.get_pixels()
+        ).digest()
+        self.__digests[pixbuf] = digest
+        return digest
+
+    def __len__(self):
+        return len(self.__pixbufs)
+
+
+def _get_size(pixbuf):
+    return pixbuf.get_rowstride() * pixbuf.get_height()
+
+
+PIXBUF_INTERN_TABLE = PixbufInternTable()
+"""The L{PixbufInternTable} used by L{PixbufIcon}s."""
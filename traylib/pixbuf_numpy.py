@@ -0,0 +1,124 @@
+"""
+Vectorized versions of the pixel operations in L{traylib.pixbuf_helper},
+using NumPy.
+
+The array functions work on C{uint8} arrays of shape C{(..., height, width,
+4)} holding RGBA pixels, so a whole stack of equally sized icons can be
+processed in one operation. The C{*_batch} functions group pixbufs by size
+and do exactly that. benchmarks/bench_pixbuf_helper.py compares them with
+the GdkPixbuf implementations, which traylib itself uses.
+
+If NumPy is not installed, C{numpy} is C{None} and none of the functions
+can be used.
+"""
+
+import gtk
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# The weights GdkPixbuf uses in gdk_pixbuf_saturate_and_pixelate().
+_LUMINANCE = (0.30, 0.59, 0.11)
+
+
+def pixbuf_to_array(pixbuf):
+    """
+    @return: A C{(height, width, 4)} array with the RGBA pixels of the
+        pixbuf. Pixbufs without an alpha channel get an opaque one.
+    """
+    width = pixbuf.get_width()
+    height = pixbuf.get_height()
+    rowstride = pixbuf.get_rowstride()
+    n_channels = pixbuf.get_n_channels()
+    pixels = numpy.frombuffer(pixbuf.get_pixels(), numpy.uint8)
+    if pixels.size < rowstride * height:
+        # The last row is not padded.
+        pixels = numpy.concatenate([
+            pixels,
+            numpy.zeros(rowstride * height - pixels.size, numpy.uint8)
+        ])
+    array = pixels[:rowstride * height].reshape(height, rowstride)
+    array = array[:, :width * n_channels].reshape(height, width, n_channels)
+    if n_channels == 4:
+        return array.copy()
+    rgba = numpy.empty((height, width, 4), numpy.uint8)
+    rgba[..., :3] = array
+    rgba[..., 3] = 255
+    return rgba
+
+
+def array_to_pixbuf(array):
+    """
+    @param array: A C{(height, width, 4)} array of RGBA pixels.
+
+    @return: A new C{gtk.gdk.Pixbuf} with the pixels of the array.
+    """
+    height, width = array.shape[:2]
+    return gtk.gdk.pixbuf_new_from_data(
+        numpy.ascontiguousarray(array, numpy.uint8).tobytes(),
+        gtk.gdk.COLORSPACE_RGB, True, 8, width, height, width * 4
+    )
+
+
+def greyscale(array):
+    """
+    @return: The pixels converted to greyscale, like
+        C{gtk.gdk.Pixbuf.saturate_and_pixelate()} with a saturation of 0.
+    """
+    rgb = array[..., :3].astype(numpy.float32)
+    intensity = numpy.dot(rgb, numpy.array(_LUMINANCE, numpy.float32))
+    result = numpy.empty_like(array)
+    result[..., :3] = numpy.clip(intensity, 0, 255)[..., numpy.newaxis]
+    result[..., 3] = array[..., 3]
+    return result
+
+
+def multiply_alpha(array, alpha):
+    """
+    @param alpha: The factor to multiply the alpha channel with (0-255).
+
+    @return: The pixels with their alpha channel multiplied, like
+        compositing them onto a transparent pixbuf with the given overall
+        alpha.
+    """
+    result = array.copy()
+    result[..., 3] = (
+        (array[..., 3].astype(numpy.uint16) * alpha + 127) // 255
+    )
+    return result
+
+
+def apply_batch(pixbufs, function, *args):
+    """
+    Apply an array function to a list of pixbufs. Pixbufs of the same size
+    are stacked and processed in one operation.
+
+    @param pixbufs: The pixbufs to process.
+    @param function: One of the array functions of this module.
+
+    @return: A list of new pixbufs, in the order of C{pixbufs}.
+    """
+    groups = {}
+    for index, pixbuf in enumerate(pixbufs):
+        size = (pixbuf.get_width(), pixbuf.get_height())
+        groups.setdefault(size, []).append(index)
+    results = [None] * len(pixbufs)
+    for indices in groups.itervalues():
+        stack = numpy.array([pixbuf_to_array(pixbufs[i]) for i in indices])
+        stack = function(stack, *args)
+        for i, array in zip(indices, stack):
+            results[i] = array_to_pixbuf(array)
+    return results
+
+
+def convert_to_greyscale_batch(pixbufs):
+    """@return: Greyscale versions of the given pixbufs."""
+    return apply_batch(pixbufs, greyscale)
+
+
+def change_alpha_batch(pixbufs, alpha):
+    """@return: Versions of the given pixbufs with their alpha changed."""
+    return apply_batch(pixbufs, multiply_alpha, alpha)
@@ -66,6 +66,11 @@ class Tray(gobject.GObject):
     boxes = property(lambda self: self.__boxes)
     """The tray's L{ItemBox}es."""
 
+    @property
+    def items(self):
+        """The L{Item}s in all of the tray's L{ItemBox}es."""
+        return [item for box in self.__boxes for item in box.items]
+
 
 gobject.type_register(Tray)
 gobject.signal_new(
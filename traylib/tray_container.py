@@ -1,5 +1,16 @@
+import gobject
+
 from traylib.tray import Tray, TrayConfig 
 from traylib.icon import IconConfig
+from traylib.icon_cache import record_icon_size
+from traylib.icon_prefetch import prefetch_icons
+
+
+PREFETCH_TIMEOUT = 0.5
+"""
+The maximum time to wait for icons to be prefetched before a new icon size
+is applied (in seconds). The main loop keeps running while waiting.
+"""
 
 
 class TrayContainer(object):
@@ -29,6 +40,11 @@ class TrayContainer(object):
         self.__min_size = min_size
         self.__vertical = vertical
         self.__tray = tray
+        # The icon size waiting for its icons to be prefetched.
+        self.__pending_size = None
+        # Items added since the last prefetch of new items.
+        self.__new_items = []
+        tray.connect("item-added", self.__tray_item_added)
         tray_widget = self.__render_tray(self.__tray)
         tray_widget.connect("destroy", self.__tray_widget_destroyed)
         self.add(tray_widget)
@@ -38,6 +54,33 @@ class TrayContainer(object):
     def __tray_widget_destroyed(self, widget):
         self.destroy()
 
+    def __tray_item_added(self, tray, box, item):
+        # Items are added one by one (at startup, all of them), so they are
+        # prefetched together once the main loop is idle.
+        if not self.__new_items:
+            gobject.idle_add(self.__prefetch_new_items)
+        self.__new_items.append(item)
+
+    def __prefetch_new_items(self):
+        items = self.__new_items
+        self.__new_items = []
+        icon_config = self.__icon_config
+        if not icon_config.async_icons:
+            prefetch_icons(
+                items, int(icon_config.size * 1.5), lambda: None,
+                snap=icon_config.snap_icon_sizes
+            )
+        return False
+
+    def __apply_icon_size(self, size):
+        if self.__pending_size != size:
+            # A newer size has been requested in the meantime.
+            return
+        self.__pending_size = None
+        self.__icon_config.size = size
+        # Icons are loaded at 1.5 times the icon size (see render_icon()).
+        record_icon_size(int(size * 1.5))
+
     def __size_allocate(self, widget, rectangle):
         if self.__vertical:
             size = rectangle[2]
@@ -57,8 +100,21 @@ class TrayContainer(object):
         """
         self.__max_size = max_size
         self.__min_size = min_size
-        size = self.get_icon_size()
-        self.__icon_config.size = max(min_size, min(size, max_size))
+        size = max(min_size, min(self.get_icon_size(), max_size))
+        if size == self.__icon_config.size or self.__icon_config.async_icons:
+            # Asynchronous icons are loaded in the background anyway.
+            self.__pending_size = size
+            self.__apply_icon_size(size)
+        elif size != self.__pending_size:
+            # Decode all icons in the background first, and update the
+            # icons when that is done.
+            self.__pending_size = size
+            prefetch_icons(
+                self.__tray.items, int(size * 1.5),
+                lambda: self.__apply_icon_size(size),
+                snap=self.__icon_config.snap_icon_sizes,
+                timeout=PREFETCH_TIMEOUT
+            )
         if self.__vertical:
             self.set_size_request(int(self.__min_size * 1.5), -1)
         else:
@@ -0,0 +1,118 @@
+"""
+Warm the persistent icon cache.
+
+Decodes the icons of the AppDirs in APPDIRPATH, of the user's home
+directories and the themed icons used by directory windows in a pool of
+processes, and stores them in the persistent icon cache. Run it after
+logging in or installing an icon theme, so the first start of a tray is as
+fast as a warm one.
+
+Usage: python -m traylib.warm_cache [SIZE...]
+
+Cached icons are only used at exactly the size they were cached in, so
+SIZE should be a size trays load icons in. Without SIZE, the sizes trays
+have recently loaded icons in are used (or 36 and 48, if no tray has run
+yet), as well as 48, the size of drag icons.
+"""
+
+import os
+import sys
+import multiprocessing
+
+from traylib.icons import FileIcon
+from traylib.appdir_index import APPDIR_INDEX
+from traylib.icon_cache import ICON_LOOKUP, get_recorded_icon_sizes
+from traylib.winitem import HOME_ICON_NAMES, DIRECTORY_ICON_NAMES
+
+
+DEFAULT_SIZES = (36, 48)
+"""
+The sizes to decode icons in if none are given and no tray has recorded the
+sizes it uses: the sizes icons are loaded in for an icon size of 24 and 32.
+"""
+
+DRAG_ICON_SIZE = 48
+"""The size of drag icons, which is always warmed by default."""
+
+
+def get_default_sizes():
+    """
+    @return: The sizes trays have recently loaded icons in (see
+        L{traylib.icon_cache.record_icon_size}) or L{DEFAULT_SIZES}, and
+        L{DRAG_ICON_SIZE}.
+    """
+    sizes = set(get_recorded_icon_sizes() or DEFAULT_SIZES)
+    sizes.add(DRAG_ICON_SIZE)
+    return sorted(sizes)
+
+
+def find_icon_paths(sizes):
+    """
+    @return: A list of C{(path, size)} tuples of the icons to warm.
+    """
+    paths = set(appdir.icon_path for appdir in APPDIR_INDEX.appdirs)
+    home = os.path.expanduser('~')
+    paths.add(os.path.join(home, '.DirIcon'))
+    try:
+        names = os.listdir(home)
+    except OSError:
+        names = []
+    for name in names:
+        path = os.path.join(home, name, '.DirIcon')
+        if not name.startswith('.') and os.path.exists(path):
+            paths.add(path)
+    icon_paths = set(
+        (path, size) for path in paths if os.path.exists(path)
+        for size in sizes
+    )
+    # Resolve themed icons here, so the workers only decode files.
+    for icon_name in HOME_ICON_NAMES + DIRECTORY_ICON_NAMES:
+        for size in sizes:
+            path = ICON_LOOKUP.lookup(icon_name, size)
+            if path is not None:
+                icon_paths.add((path, size))
+    return sorted(icon_paths)
+
+
+def _warm(args):
+    path, size = args
+    return FileIcon(path).get_pixbuf(size) is not None
+
+
+def warm_cache(sizes=None, processes=None):
+    """
+    Decode icons in a pool of processes and store them in the persistent
+    icon cache.
+
+    @param sizes: The sizes to decode the icons in (default:
+        L{get_default_sizes}).
+    @param processes: The number of processes (default: number of CPUs).
+
+    @return: A tuple C{(loaded, failed)}.
+    """
+    if sizes is None:
+        sizes = get_default_sizes()
+    icon_paths = find_icon_paths(sizes)
+    pool = multiprocessing.Pool(processes)
+    try:
+        results = pool.map(_warm, icon_paths)
+    finally:
+        pool.close()
+        pool.join()
+    loaded = results.count(True)
+    return loaded, len(results) - loaded
+
+
+def main(args):
+    try:
+        sizes = [int(arg) for arg in args] or None
+    except ValueError:
+        sys.stderr.write(__doc__.strip() + '\n')
+        return 2
+    loaded, failed = warm_cache(sizes)
+    print "%d icons cached, %d failed." % (loaded, failed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
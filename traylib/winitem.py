@@ -10,6 +10,16 @@ from traylib.item import Item
 from traylib.menu_renderer import render_menu_item
 from traylib.winmenu import WindowActionMenu, WindowMenu
 from traylib.icons import FileIcon, ThemedIcon, PixbufIcon
+from traylib.icon_cache import WINDOW_CLASS_ICON_CACHE
+
+
+HOME_ICON_NAMES = ['user-home', 'gnome-fs-home']
+"""Themed icons tried for windows showing the home directory."""
+
+DIRECTORY_ICON_NAMES = ['mime-inode:directory', 'folder', 'gnome-fs-directory']
+"""Themed icons tried for windows showing any other directory."""
+
+_home = os.path.expanduser('~')
 
 
 class WindowItem(Item):
@@ -64,6 +74,10 @@ class WindowItem(Item):
         self.changed("icon", "is-visible")
 
     def __window_icon_changed(self, window):
+        key = self.get_icon_class_key()
+        if key is not None:
+            for snap in (False, True):
+                WINDOW_CLASS_ICON_CACHE.discard(key + (snap,))
         self.changed("icon")
 
     def __window_name_changed(self, window):
@@ -92,6 +106,21 @@ class WindowItem(Item):
             name = "!! " + name + " !!"
         return name.replace('_', '__')
 
+    def get_cached_icon(self, size, snap=False):
+        """
+        Shares the icon between all windows with the same
+        L{icon class key<get_icon_class_key>}.
+        """
+        key = self.get_icon_class_key()
+        if key is None:
+            return None
+        return WINDOW_CLASS_ICON_CACHE.get(key + (snap,), size, None)
+
+    def cache_icon(self, size, snap, pixbuf):
+        key = self.get_icon_class_key()
+        if key is not None:
+            WINDOW_CLASS_ICON_CACHE.put(key + (snap,), size, None, pixbuf)
+
     def get_icons(self):
         return [
             ThemedIcon(self.__window.get_icon_name()),
@@ -176,6 +205,19 @@ class WindowItem(Item):
     def get_base_name(self):
         return self.__window.get_name()
 
+    def get_icon_class_key(self):
+        """
+        Override this to determine which windows share their icon.
+
+        @return: A tuple identifying the icon, or C{None} if the icon
+            should not be shared. By default, windows of the same class
+            with the same icon name share their icon.
+        """
+        return (
+            self.__window.get_class_group().get_res_class(),
+            self.__window.get_icon_name(),
+        )
+
 
     # Properties:
 
@@ -191,6 +233,12 @@ class ADirectoryWindowItem(WindowItem):
         self.__window_handlers = [
             window.connect("name-changed", self.__window_name_changed),
         ]
+        self.__parsed_title = None
+        self.__path = None
+        # The path "path" was last emitted for. self.__path cannot be used
+        # for this, as any getter may have refreshed it already.
+        self.__emitted_path = None
+        self.__dir_icons = None
         self.connect("changed", self.__changed)
         self.connect("destroyed", self.__destroyed)
 
@@ -206,28 +254,25 @@ class ADirectoryWindowItem(WindowItem):
             self.changed("name", "icon")
 
     def __window_name_changed(self, window):
-        self.changed("path")
+        path = self.path
+        if path != self.__emitted_path:
+            self.__emitted_path = path
+            self.changed("path")
 
 
     # Item implementation:
 
     def get_icons(self):
-        path = self.get_path()
-        icons = [
-            FileIcon(
-                os.path.expanduser(os.path.join(path, '.DirIcon'))
-            ),
-        ]
-        if os.path.expanduser(path) == os.path.expanduser('~'):
-            icons += [ThemedIcon('user-home'), ThemedIcon('gnome-fs-home')]
-        else:
-            icons += [
-                ThemedIcon('mime-inode:directory'),
-                ThemedIcon('folder'),
-                ThemedIcon('gnome-fs-directory')
-            ]
-        icons += WindowItem.get_icons(self)
-        return icons
+        path = self.path
+        if self.__dir_icons is None:
+            path = os.path.expanduser(path)
+            icons = [FileIcon(os.path.join(path, '.DirIcon'))]
+            if path == _home:
+                icons += [ThemedIcon(name) for name in HOME_ICON_NAMES]
+            else:
+                icons += [ThemedIcon(name) for name in DIRECTORY_ICON_NAMES]
+            self.__dir_icons = icons
+        return self.__dir_icons + WindowItem.get_icons(self)
 
     def get_drag_source_targets(self):
         return WindowItem.get_drag_source_targets(self) + [
@@ -244,36 +289,61 @@ class ADirectoryWindowItem(WindowItem):
         WindowItem.drag_data_get(self, context, data, info, time)
         if info == TARGET_URI_LIST:
             data.set_uris([
-                'file://%s' % pathname2url(os.path.expanduser(self.get_path()))
+                'file://%s' % pathname2url(os.path.expanduser(self.path))
             ])
 
 
     # WindowItem implementation:
 
     def get_base_name(self):
-        path = self.get_path()
+        path = self.path
         if path is None:
             return WindowItem.get_base_name(self)
         return path
 
+    def get_icon_class_key(self):
+        # The icon depends on the path.
+        return None
+
 
     # Methods to be implemented by subclasses:
 
     def get_path(self):
+        """
+        Override this to determine the path from the window title.
+
+        @return: The path or C{None}.
+        """
         raise NotImplementedError
 
 
+    # Properties:
+
+    @property
+    def path(self):
+        """
+        The path returned by L{get_path}, which is only called again when
+        the window title has changed.
+        """
+        title = self.window.get_name()
+        if title != self.__parsed_title:
+            self.__path = self.get_path()
+            self.__parsed_title = title
+            self.__dir_icons = None
+        return self.__path
+
+
 gobject.type_register(ADirectoryWindowItem)
 
 
 class FilerDirectoryWindowItem(ADirectoryWindowItem):
 
     def get_path(self):
+        # Strip the " (...)" or " +" suffix ROX-Filer appends to the path.
         name = self.window.get_name()
-        for i in range(1-len(name), 0):
-            if name[-i] == '(' or name[-i] == '+':
-                name = name[:-(i+1)]
-                break
+        i = max(name.rfind('('), name.rfind('+'))
+        if i > 0:
+            name = name[:i-1]
         return name
 
 
@@ -289,6 +359,9 @@ class TerminalWindowItem(ADirectoryWindowItem):
     def get_icons(self):
         return WindowItem.get_icons(self)
 
+    def get_icon_class_key(self):
+        return WindowItem.get_icon_class_key(self)
+
 
 def is_filer_window(window):
     name = window.get_name()